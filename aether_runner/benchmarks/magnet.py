@@ -0,0 +1,99 @@
+"""Coste por tick del imán según la cantidad de fragmentos del nivel.
+
+Uso (desde aether_runner/):
+    python benchmarks/magnet.py [--ticks 300] [--counts 100 1000 5000] [--density 100]
+
+Para cada cantidad de fragmentos se cronometra solo ``apply_magnet`` (sin
+recoger fragmentos y con los atraídos devueltos a su sitio tras cada
+llamada, así que la carga no cambia entre llamadas), en dos repartos:
+
+- pantalla: todos en un área del tamaño de la pantalla, así que la densidad
+  (y los fragmentos dentro del radio del imán) crece con la cantidad;
+- densidad constante: en un mundo que se alarga con la cantidad, con
+  ``--density`` fragmentos por pantalla.
+
+Con la consulta por radio el coste depende de los fragmentos cercanos al
+jugador (columna «atraídos»), no del total: en el segundo reparto debe
+mantenerse casi plano.
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from config import *
+from game import Game
+
+
+def build_game(fragments, width=SCREEN_WIDTH, seed=1):
+    """Nivel 1 con ``fragments`` fragmentos repartidos en ``width`` x la altura de la pantalla"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = Game(headless=True, seed=seed)
+    rng = random.Random(seed)
+    for _ in range(fragments):
+        game.item_manager.spawn_item(rng.randint(0, width), rng.randint(0, SCREEN_HEIGHT))
+    return game
+
+
+def world_width(fragments, density):
+    """Ancho del mundo con ``density`` fragmentos por pantalla (al menos una pantalla)"""
+    return max(SCREEN_WIDTH, SCREEN_WIDTH * fragments // density)
+
+
+def measure(fragments, ticks, width=SCREEN_WIDTH):
+    """(µs por llamada a ``apply_magnet``, fragmentos atraídos por llamada)
+
+    Solo se cronometra ``apply_magnet``, sin actualizar ni recoger items, y
+    tras cada llamada los fragmentos atraídos vuelven a su sitio: todas las
+    llamadas ven el mismo reparto.
+    """
+    game = build_game(fragments, width)
+    player, items = game.player, game.item_manager
+    items.refresh_index()
+    home = {item: item.rect.center for item in items.items}
+    # El jugador recorre la pantalla para que el imán encuentre fragmentos
+    path = [(x, SCREEN_HEIGHT // 2) for x in range(100, SCREEN_WIDTH - 100, 7)]
+
+    elapsed = 0.0
+    pulled = 0
+    for tick in range(ticks):
+        player.rect.center = path[tick % len(path)]
+        start = time.perf_counter()
+        items.apply_magnet(player, game.dt)
+        elapsed += time.perf_counter() - start
+        # Los atraídos siguen dentro del radio (solo se acercan al jugador)
+        for item in items.index.query_radius(player.rect.center, MAGNET_RADIUS):
+            if item.magnet_pos is not None:
+                pulled += 1
+                item.magnet_pos = None
+                item.rect.center = home[item]
+                items.index.update(item)
+    return elapsed * 1e6 / ticks, pulled / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del imán")
+    parser.add_argument('--ticks', type=int, default=300)
+    parser.add_argument('--counts', type=int, nargs='+', default=[100, 500, 1000, 5000, 10000])
+    parser.add_argument('--density', type=int, default=100,
+                        help='fragmentos por pantalla en el reparto de densidad constante')
+    args = parser.parse_args()
+
+    print(f"🧲 Imán: radio {MAGNET_RADIUS}px, {args.ticks} llamadas por medida")
+    print(f"{'reparto':<20} {'fragmentos':>10} {'ancho (px)':>11} {'atraídos':>9} {'imán (µs)':>10}")
+    for name, constant_density in (('pantalla', False), ('densidad constante', True)):
+        for count in args.counts:
+            width = world_width(count, args.density) if constant_density else SCREEN_WIDTH
+            cost, pulled = measure(count, args.ticks, width)
+            print(f"{name:<20} {count:>10} {width:>11} {pulled:>9.1f} {cost:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Rendimiento de la simulación y del dibujado por escenario.
+
+Uso (desde aether_runner/):
+    python benchmarks/scenarios.py [--ticks 600] [--count N] [--only nivel_1 ...]
+                                   [--output resultados.json]
+                                   [--baseline base.json] [--threshold 0.10]
+
+Escenarios: todos los niveles (el 7, más ancho que la pantalla, recorre los
+trozos del nivel) y escenas de estrés sobre el nivel 1 con N enemigos,
+proyectiles, partículas o fragmentos vivos (se reponen en cada tick hasta
+llegar a N, dentro de la capacidad de cada pool). Todos se juegan con
+controles guionizados y semilla fija. Para cada uno se mide:
+
+- ticks/s solo de simulación (``Game.step``),
+- ticks/s de simulación más dibujado por software (``Game.draw``),
+- KiB reservados por tick (pico de tracemalloc dentro del tick) y bloques
+  netos por tick (``sys.getallocatedblocks``, crece si algo se acumula),
+- pico de RSS del proceso (cada escenario corre en su propio proceso).
+
+Los resultados se guardan en JSON; con ``--baseline`` se comparan con otra
+ejecución y el script termina con código 1 si alguna métrica empeora más que
+``--threshold``.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+try:
+    import resource  # Solo en sistemas Unix
+except ImportError:
+    resource = None
+
+from config import *
+from controls import InputState
+from game import Game
+
+SEED = 1
+WARMUP_TICKS = 60
+ALLOC_TICKS = 120
+LEVELS = range(1, LEVEL_COUNT + 1)
+STRESS_COUNTS = {'enemigos': 200, 'proyectiles': 500, 'particulas': 1000, 'fragmentos': 2000}
+SCENARIOS = [f'nivel_{number}' for number in LEVELS] + [f'estres_{kind}' for kind in STRESS_COUNTS]
+
+# Métrica -> True si más es mejor (para comparar con la referencia)
+METRICS = {'sim_ticks_s': True, 'render_ticks_s': True,
+           'alloc_kib_tick': False, 'peak_rss_mib': False}
+
+
+def scripted_input(game, tick, attack=True):
+    """Controles del tick: correr a un lado y a otro saltando (y atacando);
+    si la partida termina o se completa el nivel, reiniciar"""
+    if game.game_state != PLAYING:
+        return InputState(restart=True)
+    right = tick % 240 < 150
+    return InputState(left=not right, right=right, jump=tick % 35 == 0,
+                      attack=attack and tick % 45 == 0)
+
+
+class Scene:
+    """Un juego sin ventana preparado para un escenario"""
+
+    def __init__(self, name, count=None):
+        self.name = name
+        self.kind = name.split('_', 1)[1] if name.startswith('estres_') else None
+        self.count = count or STRESS_COUNTS.get(self.kind)
+        level = 1 if self.kind else int(name.split('_')[1])
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.game = Game(headless=True, seed=SEED, start_level=level)
+        self.tick = 0
+        self.placement = 0
+
+    def spot(self):
+        """Posición de la siguiente entidad de estrés: recorre la vista en rejilla"""
+        self.placement += 1
+        view = self.game.camera.view
+        x = view.left + 40 + self.placement * 37 % (view.width - 80)
+        y = 60 + self.placement * 53 % (SCREEN_HEIGHT - 160)
+        return x, y
+
+    def top_up(self):
+        """Reponer las entidades de estrés hasta tener ``count`` vivas"""
+        game = self.game
+        if self.kind == 'enemigos':
+            # Tres sombras por cada tirador
+            for i in range(self.count - game.enemy_manager.get_enemy_count()):
+                enemy_type = 'SHOOTER' if i % 4 == 3 else 'FLOATER'
+                game.spawn_enemy_record((enemy_type, *self.spot(), False, i * 0.7))
+        elif self.kind == 'proyectiles':
+            projectiles = game.enemy_manager.projectiles
+            for i in range(self.count - len(projectiles)):
+                x, y = self.spot()
+                projectiles.fire(x, y, 1 if i % 2 else -1, 0)
+        elif self.kind == 'particulas':
+            particles = game.player.particles
+            x, y = self.spot()
+            particles.emit(self.count - particles.count, x, y, vel_x=(-3, 3), vel_y=(-3, 3),
+                           color=(255, 200, 80), life=40, size=(2, 4))
+        elif self.kind == 'fragmentos':
+            items = game.item_manager
+            for _ in range(self.count - items.get_fragment_count()):
+                items.spawn_item(*self.spot())
+
+    def step(self):
+        game = self.game
+        if self.kind:
+            # El jugador no debe morir: la escena tiene que seguir en juego
+            if game.game_state == PLAYING and not game.player.powerups['invincibility']['active']:
+                game.player.activate_powerup('invincibility', duration=10 ** 9)
+            self.top_up()
+        game.step(scripted_input(game, self.tick, attack=self.kind is None))
+        self.tick += 1
+
+    def live_counts(self):
+        game = self.game
+        return {'enemigos': game.enemy_manager.get_enemy_count(),
+                'proyectiles': len(game.enemy_manager.projectiles),
+                'particulas': game.player.particles.count,
+                'fragmentos': game.item_manager.get_fragment_count()}
+
+
+def prepared_scene(name, count):
+    scene = Scene(name, count)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(WARMUP_TICKS):
+            scene.step()
+    return scene
+
+
+def ticks_per_second(name, count, ticks, render):
+    scene = prepared_scene(name, count)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(ticks):
+            scene.step()
+            if render:
+                scene.game.draw(0.5)
+        elapsed = time.perf_counter() - start
+    return ticks / elapsed, scene
+
+
+def allocations(name, count, ticks):
+    """(KiB reservados de media dentro de un tick, bloques netos por tick)"""
+    scene = prepared_scene(name, count)
+    with contextlib.redirect_stdout(io.StringIO()):
+        blocks = sys.getallocatedblocks()
+        tracemalloc.start()
+        total = 0
+        for _ in range(ticks):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            scene.step()
+            total += tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+        blocks = sys.getallocatedblocks() - blocks
+    return total / ticks / 1024, blocks / ticks
+
+
+def peak_rss_mib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KiB y macOS en bytes
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def run_scenario(name, count, ticks):
+    """Medir un escenario en este proceso"""
+    sim, scene = ticks_per_second(name, count, ticks, render=False)
+    render, _ = ticks_per_second(name, count, ticks, render=True)
+    alloc_kib, blocks = allocations(name, count, min(ticks, ALLOC_TICKS))
+    if scene.kind:
+        scene.top_up()  # Lo que había vivo durante cada tick
+    return {'sim_ticks_s': sim, 'render_ticks_s': render, 'alloc_kib_tick': alloc_kib,
+            'blocks_tick': blocks, 'peak_rss_mib': peak_rss_mib(), 'vivos': scene.live_counts()}
+
+
+def run_isolated(name, count, ticks):
+    """Medir un escenario en un proceso nuevo (RSS y cachés independientes)"""
+    command = [sys.executable, os.path.abspath(__file__), '--scenario', name, '--ticks', str(ticks)]
+    if count:
+        command += ['--count', str(count)]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    """Imprimir la variación frente a la referencia y devolver las regresiones"""
+    regressions = []
+    print(f"\nComparación con la referencia (umbral {threshold:.0%}):")
+    for name, metrics in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            value, base = metrics.get(metric), reference.get(metric)
+            if not value or not base:
+                continue
+            change = (value - base) / base
+            worse = -change if higher_is_better else change
+            mark = '❌' if worse > threshold else '  '
+            print(f"{mark} {name:<20} {metric:<15} {base:>10.1f} -> {value:>10.1f} ({change:+.1%})")
+            if worse > threshold:
+                regressions.append((name, metric, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark por escenarios")
+    parser.add_argument('--ticks', type=int, default=600)
+    parser.add_argument('--count', type=int, default=None,
+                        help='entidades de las escenas de estrés (por defecto, según la escena)')
+    parser.add_argument('--only', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--output', default=None, help='guardar los resultados en JSON')
+    parser.add_argument('--baseline', default=None, help='JSON de referencia con el que comparar')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='empeoramiento relativo tolerado frente a la referencia')
+    parser.add_argument('--scenario', choices=SCENARIOS, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        # Proceso hijo: un solo escenario, resultado en la última línea
+        print(json.dumps(run_scenario(args.scenario, args.count, args.ticks)))
+        return
+
+    print(f"⏱️ Escenarios: {args.ticks} ticks por medida, semilla {SEED}")
+    print(f"{'escenario':<20} {'sim (t/s)':>10} {'+dibujo (t/s)':>14} "
+          f"{'KiB/tick':>9} {'bloques/tick':>13} {'RSS (MiB)':>10}")
+    results = {}
+    for name in args.only:
+        metrics = results[name] = run_isolated(name, args.count, args.ticks)
+        rss = metrics['peak_rss_mib']
+        rss = '-' if rss is None else f'{rss:.1f}'
+        print(f"{name:<20} {metrics['sim_ticks_s']:>10.0f} {metrics['render_ticks_s']:>14.0f} "
+              f"{metrics['alloc_kib_tick']:>9.1f} {metrics['blocks_tick']:>13.2f} {rss:>10}")
+
+    if args.output:
+        report = {'python': platform.python_version(), 'platform': platform.platform(),
+                  'ticks': args.ticks, 'seed': SEED, 'scenarios': results}
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"📊 Resultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)['scenarios']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} métricas empeoran más de un {args.threshold:.0%}")
+            sys.exit(1)
+        print("✅ Sin regresiones frente a la referencia")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import pygame
+from config import *
+
+class Camera:
+    """Cámara con desplazamiento horizontal que sigue al jugador
+
+    El mundo puede medir varias pantallas de ancho; la cámara centra al
+    jugador sin salirse de los bordes del nivel. ``view`` es el área del
+    mundo que se ve en pantalla.
+    """
+
+    def __init__(self, level_width=SCREEN_WIDTH):
+        self.level_width = max(level_width, SCREEN_WIDTH)
+        self.left = 0  # Borde izquierdo del mundo (avanza en el modo infinito)
+        self.x = 0
+        self.view = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+
+    def follow(self, center_x):
+        """Centrar la vista en ``center_x`` (limitada al nivel)"""
+        self.x = int(max(self.left, min(center_x - SCREEN_WIDTH // 2, self.level_width - SCREEN_WIDTH)))
+        self.view.x = self.x
+        return self.x
+
+    def to_screen(self, rect):
+        """Rectángulo del mundo en coordenadas de pantalla"""
+        return rect.move(-self.x, 0)
@@ -0,0 +1,174 @@
+"""Resolución de colisiones por barrido (swept AABB) contra las plataformas.
+
+El movimiento de un rectángulo se aplica primero en x y después en y. En cada
+eje se buscan, a través del índice espacial, las plataformas que el
+rectángulo cruzaría durante el tick y se detiene en el contacto más cercano,
+así que no hay efecto túnel aunque la velocidad o el paso de simulación sean
+grandes. Para las plataformas móviles se usa su posición al inicio del tick
+(``previous``): el contacto se calcula con el movimiento relativo.
+"""
+import numpy as np
+
+# Resultados de un barrido vertical
+LANDED = 'landed'
+BONKED = 'bonked'
+
+
+def expand_ranges(first, counts):
+    """Pares (i, j) con j en first[i] .. first[i] + counts[i] - 1, vectorizado"""
+    owner = np.repeat(np.arange(len(first)), counts)
+    return owner, np.arange(len(owner)) + np.repeat(first - np.cumsum(counts) + counts, counts)
+
+
+class StaticFloors:
+    """Bordes de las plataformas fijas agrupados por columnas de la rejilla
+
+    ``platforms[starts[c]:starts[c + 1]]`` son las plataformas que tocan la
+    columna ``c`` (contada desde ``origin``), así que un rectángulo solo se
+    compara con las de sus columnas.
+    """
+
+    def __init__(self, edges, cell_size):
+        self.left, self.right, self.top = (edges[:, i].copy() for i in range(3))
+        self.cell_size = cell_size
+        if len(edges) == 0:
+            self.origin = 0
+            self.starts = np.zeros(1, dtype=np.intp)
+            self.platforms = np.zeros(0, dtype=np.intp)
+            return
+        first = (self.left // cell_size).astype(np.intp)
+        last = ((self.right - 1) // cell_size).astype(np.intp)
+        self.origin = int(first.min())
+        first -= self.origin
+        last -= self.origin
+        platforms, columns = expand_ranges(first, last - first + 1)
+        order = np.argsort(columns, kind='stable')
+        self.platforms = platforms[order]
+        self.starts = np.searchsorted(columns[order], np.arange(last.max() + 2))
+
+    def __len__(self):
+        return len(self.top)
+
+    def candidates(self, x, width):
+        """Pares (índice en ``x``, plataforma) que comparten columna"""
+        columns = len(self.starts) - 1
+        first = np.clip(x // self.cell_size - self.origin, 0, columns - 1).astype(np.intp)
+        last = np.clip((x + width - 1) // self.cell_size - self.origin, 0, columns - 1).astype(np.intp)
+        owner, column = expand_ranges(first, last - first + 1)
+        starts = self.starts
+        pair, slot = expand_ranges(starts[column], starts[column + 1] - starts[column])
+        return owner[pair], self.platforms[slot]
+
+
+class LevelCollider:
+    """Colisionador de un nivel (plataformas sólidas y de un solo sentido)"""
+
+    def __init__(self, index, solid_platforms, one_way_platforms):
+        self.index = index
+        self.solid_platforms = solid_platforms
+        self.one_way_platforms = one_way_platforms
+        self.previous = {}  # plataforma -> (x, y) al inicio del tick
+        self.moving_platforms = []  # Las que se mueven (lo asigna Game)
+        self._static_floors = None  # (versión del índice, arrays) de las fijas
+
+    def previous_topleft(self, platform):
+        """Posición de la plataforma al inicio del tick"""
+        return self.previous.get(platform, platform.rect.topleft)
+
+    def set_moving_platforms(self, platforms):
+        self.moving_platforms = list(platforms)
+        self._static_floors = None
+
+    def static_floors(self):
+        """Plataformas fijas como arrays para aterrizajes vectorizados
+
+        Devuelve ``StaticFloors``: bordes (izquierda, derecha, arriba) y,
+        por columnas de la rejilla del índice (solo en x), qué plataformas
+        cubre cada una. Se reconstruye solo cuando cambia el conjunto de
+        plataformas del índice (al activar o retirar trozos).
+        """
+        version = self.index.version
+        if self._static_floors is None or self._static_floors[0] != version:
+            moving = set(self.moving_platforms)
+            edges = np.array([(p.rect.left, p.rect.right, p.rect.top)
+                              for p in self.index if p not in moving],
+                             dtype=np.float32).reshape(-1, 3)
+            self._static_floors = (version, StaticFloors(edges, self.index.cell_size))
+        return self._static_floors[1]
+
+    def moving_floor_arrays(self):
+        """Arrays (izquierda, derecha, arriba, arriba al inicio del tick) de
+        las plataformas móviles, con su posición de este tick"""
+        edges = np.array([(p.rect.left, p.rect.right, p.rect.top, self.previous_topleft(p)[1])
+                          for p in self.moving_platforms], dtype=np.float32).reshape(-1, 4)
+        return edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+
+    def move_x(self, rect, dx):
+        """Mover en x hasta la primera pared sólida; devuelve True si chocó"""
+        if dx == 0:
+            return False
+
+        limit = None
+        for platform in self.index.query(rect.union(rect.move(dx, 0))):
+            if platform not in self.solid_platforms:
+                continue
+            other = platform.rect
+            if other.top >= rect.bottom or other.bottom <= rect.top:
+                continue
+            prev_left = self.previous_topleft(platform)[0]
+            if dx > 0 and prev_left >= rect.right:
+                stop = other.left - rect.width
+                limit = stop if limit is None else min(limit, stop)
+            elif dx < 0 and prev_left + other.width <= rect.left:
+                stop = other.right
+                limit = stop if limit is None else max(limit, stop)
+
+        if limit is None:
+            rect.x += dx
+            return False
+        rect.x = limit
+        return True
+
+    def move_y(self, rect, dy, snap=0, ceilings=True):
+        """Mover en y resolviendo contra suelos y techos
+
+        Cualquier plataforma hace de suelo si se cae sobre ella desde arriba;
+        solo las sólidas hacen de techo (si ``ceilings``). ``snap`` permite
+        pegarse a un suelo hasta esa distancia por debajo (plataformas que
+        bajan). Devuelve LANDED, BONKED o None.
+        """
+        if dy >= 0:
+            reach = dy + snap
+            floor = None
+            if reach > 0:
+                for platform in self.index.query(rect.union(rect.move(0, reach))):
+                    other = platform.rect
+                    if other.right <= rect.left or other.left >= rect.right:
+                        continue
+                    prev_top = self.previous_topleft(platform)[1]
+                    if prev_top >= rect.bottom and other.top <= rect.bottom + reach:
+                        floor = other.top if floor is None else min(floor, other.top)
+
+            if floor is not None:
+                rect.bottom = floor
+                return LANDED
+            rect.y += dy
+            return None
+
+        ceiling = None
+        if ceilings:
+            for platform in self.index.query(rect.union(rect.move(0, dy))):
+                if platform not in self.solid_platforms:
+                    continue
+                other = platform.rect
+                if other.right <= rect.left or other.left >= rect.right:
+                    continue
+                prev_bottom = self.previous_topleft(platform)[1] + other.height
+                if prev_bottom <= rect.top:
+                    ceiling = other.bottom if ceiling is None else max(ceiling, other.bottom)
+
+        if ceiling is not None:
+            rect.top = ceiling
+            return BONKED
+        rect.y += dy
+        return None
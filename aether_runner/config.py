@@ -6,12 +6,19 @@ import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ASSETS_DIR = os.path.join(BASE_DIR, 'assets')
 SOUNDS_DIR = os.path.join(ASSETS_DIR, 'sounds')
+LEVELS_DIR = os.path.join(BASE_DIR, 'levels')
 
 # Dimensiones de la pantalla
 SCREEN_WIDTH = 1000
 SCREEN_HEIGHT = 700
 FPS = 60
 
+# Simulación a paso fijo (las constantes de física están expresadas por tick a 60 Hz)
+BASE_TICK_RATE = 60
+TICK_RATE = 60            # Ticks de simulación por segundo
+MAX_FRAME_TIME = 0.25     # Segundos máximos a simular por frame (evita la espiral de la muerte)
+INTERPOLATION_SNAP = 64   # Saltos mayores (px) no se interpolan (respawn, teletransporte)
+
 # Colores
 BACKGROUND_COLOR = (10, 5, 30)
 PLAYER_COLOR = (100, 200, 255)
@@ -22,6 +29,7 @@ ENEMY_COLOR_SHOOTER = (220, 60, 80)
 
 # Configuración del jugador
 PLAYER_SPEED = 8
+PLAYER_GROUND_SNAP = 4  # Distancia (px) a la que el jugador se pega al suelo
 PLAYER_ACCELERATION = 0.5
 PLAYER_FRICTION = -0.12
 PLAYER_GRAVITY = 0.8
@@ -34,6 +42,19 @@ PLAYING = 1
 GAME_OVER = 2
 LEVEL_COMPLETE = 3
 
+# Niveles (levels/level_N.json)
+LEVEL_COUNT = 7
+CHUNK_WIDTH = 500            # Ancho (px) de los trozos en que se divide un nivel
+CHUNK_ACTIVATE_MARGIN = 300  # Un trozo se activa al acercarse a menos de esto de la vista
+CHUNK_RETIRE_MARGIN = 800    # y se retira al alejarse más de esto (histéresis)
+
+# Modo infinito (trozos generados a partir de una semilla)
+ENDLESS_CHUNKS_AHEAD = 4   # Trozos generados por delante del último que se pidió
+ENDLESS_CHUNKS_BEHIND = 4  # Trozos conservados por detrás del primero activo (los demás se descartan)
+ENDLESS_JUMP_SAFETY = 0.75  # Fracción del alcance de un salto usada como hueco máximo
+ENDLESS_MIN_Y = 280        # Altura mínima (borde superior) de las plataformas del camino
+ENDLESS_MAX_Y = 620        # y máxima
+
 # Sistema de objetos
 ITEM_TYPES = {
     'FRAGMENT': {'color': (100, 200, 255), 'points': 10, 'size': (15, 15)},
@@ -42,6 +63,23 @@ ITEM_TYPES = {
     'MAGNET': {'color': (255, 100, 200), 'points': 0, 'size': (20, 20), 'duration': 6000}
 }
 
+# Imán: atrae los fragmentos dentro del radio con un acercamiento suavizado
+MAGNET_RADIUS = 200  # px desde el centro del jugador
+MAGNET_EASING = 0.12  # Fracción de la distancia restante recorrida por tick base
+
+# Partículas
+PARTICLE_CAPACITY = 1024
+
+# Índice espacial (tamaño de celda en px)
+SPATIAL_CELL_SIZE = 64
+
 # Configuración de enemigos
 ENEMY_SPEED = 2
-PROJECTILE_SPEED = 5
\ No newline at end of file
+PROJECTILE_SPEED = 5
+FLOATER_AI_STEPS = 2  # Pasos de IA de las sombras por tick (conserva su ritmo histórico)
+PROJECTILE_LIFETIME = 180  # Ticks base
+PROJECTILE_CAPACITY = 512  # Proyectiles vivos a la vez (todos los tiradores)
+
+# Renderizado
+RENDER_MODE = 'full'        # 'full' (pantalla completa) o 'dirty' (rectángulos sucios)
+DIRTY_RECT_THRESHOLD = 0.5  # Fracción de pantalla sucia a partir de la cual se hace flip completo
\ No newline at end of file
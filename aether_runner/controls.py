@@ -0,0 +1,35 @@
+from collections import namedtuple
+import pygame
+
+_FIELDS = (
+    'left', 'right', 'down', 'jump', 'attack',      # teclas mantenidas
+    'restart', 'next_level', 'toggle_music',        # pulsaciones (KEYDOWN)
+    'debug_complete',
+)
+
+class InputState(namedtuple('InputState', _FIELDS, defaults=(False,) * len(_FIELDS))):
+    """Estado de los controles para un tick de simulación
+
+    El juego no lee el teclado directamente: recibe un InputState por tick,
+    de modo que la simulación puede alimentarse desde el teclado, desde un
+    script o sin ventana.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_keyboard(cls, pressed=()):
+        """Leer las teclas mantenidas; ``pressed`` son las teclas de KEYDOWN del frame"""
+        keys = pygame.key.get_pressed()
+        return cls(
+            left=bool(keys[pygame.K_LEFT] or keys[pygame.K_a]),
+            right=bool(keys[pygame.K_RIGHT] or keys[pygame.K_d]),
+            down=bool(keys[pygame.K_DOWN] or keys[pygame.K_s]),
+            jump=bool(keys[pygame.K_SPACE] or keys[pygame.K_UP] or keys[pygame.K_w]),
+            attack=bool(keys[pygame.K_x]),
+            restart=pygame.K_r in pressed,
+            next_level=pygame.K_n in pressed,
+            toggle_music=pygame.K_m in pressed,
+            debug_complete=bool(keys[pygame.K_p]),
+        )
+
+NO_INPUT = InputState()
@@ -0,0 +1,151 @@
+"""Modo infinito: trozos de nivel generados a partir de una semilla.
+
+``ChunkGenerator`` encadena plataformas alcanzables con un salto normal
+(según PLAYER_JUMP, PLAYER_GRAVITY y la velocidad máxima de carrera) y
+reparte enemigos, fragmentos y algún power-up sobre ellas. Cada trozo usa su
+propio flujo de la simulación (``RandomService.gameplay_stream``) con su
+índice como clave, así que la misma semilla produce siempre el mismo
+recorrido aunque la generación vaya en otro hilo. ``EndlessLevel`` genera
+los trozos por delante del jugador en un hilo de fondo y los entrega por una
+cola. Un trozo se recoge en el tick en que la cámara lo necesita (siempre el
+mismo, para que las repeticiones coincidan); como el hilo va ENDLESS_CHUNKS_AHEAD
+trozos por delante, en la práctica ya está listo y no hay espera.
+"""
+import math
+import queue
+import threading
+from config import *
+from level_loader import Level, LevelChunk
+from enemies import Enemy
+
+ENDLESS_WIDTH = 10 ** 9  # Ancho del "nivel": la cámara nunca llega al final
+
+# Velocidad de carrera sostenida: la aceleración se equilibra con la fricción
+RUN_SPEED = min(PLAYER_SPEED, PLAYER_ACCELERATION / -PLAYER_FRICTION)
+JUMP_HEIGHT = PLAYER_JUMP ** 2 / (2 * PLAYER_GRAVITY)
+
+POWERUP_TYPES = ('INVINCIBILITY', 'JUMP_BOOST', 'MAGNET')
+
+
+def jump_reach(rise):
+    """Distancia horizontal de un salto que aterriza ``rise`` px más arriba
+    (negativo si aterriza más abajo)"""
+    speed = -PLAYER_JUMP
+    rise = min(rise, JUMP_HEIGHT)
+    airtime = (speed + math.sqrt(speed * speed - 2 * PLAYER_GRAVITY * rise)) / PLAYER_GRAVITY
+    return RUN_SPEED * airtime
+
+
+class ChunkGenerator:
+    """Generador determinista de trozos (se llama siempre en orden)"""
+
+    def __init__(self, rng):
+        self.rng = rng  # RandomService de la partida
+        self.index = 0
+        self.end_x = 0              # Borde derecho de la última plataforma del camino
+        self.end_y = ENDLESS_MAX_Y  # Borde superior de esa plataforma
+        self.enemy_sizes = {enemy_type: Enemy(0, 0, enemy_type).rect.size
+                            for enemy_type in ('FLOATER', 'SHOOTER')}
+
+    def next_chunk(self):
+        index = self.index
+        rng = self.rng.gameplay_stream('infinito', index)
+        left = index * CHUNK_WIDTH
+        right = left + CHUNK_WIDTH
+        extent_left, extent_right = left, right
+        solid, one_way, moving, enemies, items = [], [], [], [], []
+        difficulty = min(1.0, index / 40)
+
+        if index == 0:
+            # Suelo de salida bajo el jugador
+            solid.append((0, ENDLESS_MAX_Y, 360, 40, PLATFORM_COLOR))
+            self.end_x, self.end_y = 360, ENDLESS_MAX_Y
+
+        while True:
+            # Siguiente plataforma del camino: subida y hueco dentro del alcance
+            y = rng.randint(max(ENDLESS_MIN_Y, self.end_y - int(JUMP_HEIGHT * 0.6)),
+                            min(ENDLESS_MAX_Y, self.end_y + 140))
+            reach = jump_reach(self.end_y - y) * ENDLESS_JUMP_SAFETY
+            x = self.end_x + int(rng.uniform(0.35, 1.0) * reach)
+            if x >= right:
+                break
+            width = rng.randrange(120, 270, 10)
+            if rng.random() < 0.2:
+                one_way.append((x, y, width, 15, PLATFORM_COLOR))
+            else:
+                solid.append((x, y, width, 25, PLATFORM_COLOR))
+            extent_right = max(extent_right, x + width)
+            self.end_x, self.end_y = x + width, y
+
+            # Encima de la plataforma: un enemigo o unos fragmentos
+            if width >= 160 and rng.random() < 0.25 + 0.35 * difficulty:
+                enemy_type = 'SHOOTER' if rng.random() < 0.3 + 0.3 * difficulty else 'FLOATER'
+                enemy_width, enemy_height = self.enemy_sizes[enemy_type]
+                enemies.append((enemy_type, x + width // 2 - enemy_width // 2, y - enemy_height,
+                                True, rng.uniform(0, 2 * math.pi)))
+            else:
+                count = rng.randint(1, 3)
+                height = ITEM_TYPES['FRAGMENT']['size'][1]
+                for i in range(count):
+                    items.append(('FRAGMENT', x + width * (i + 1) // (count + 1), y - 10 - height // 2))
+            if rng.random() < 0.04:
+                height = ITEM_TYPES['MAGNET']['size'][1]
+                items.append((rng.choice(POWERUP_TYPES), x + width // 2, y - 60 - height // 2))
+
+        # De vez en cuando, una plataforma móvil por encima del camino
+        if rng.random() < 0.3:
+            x = left + rng.randrange(50, 350)
+            moving.append((x, rng.randrange(140, 240), 120, 20, PLATFORM_COLOR, 1, 0, 80, 2))
+            extent_left = min(extent_left, x - 84)
+            extent_right = max(extent_right, x + 120 + 84)
+
+        self.index += 1
+        return LevelChunk(index, extent_left, extent_right, tuple(solid), tuple(one_way),
+                          tuple(moving), tuple(enemies), tuple(items))
+
+
+class EndlessLevel(Level):
+    """Nivel sin final cuyos trozos se generan en un hilo de fondo
+
+    ``rng`` es el ``RandomService`` de la partida. ``prepare_chunk``
+    (opcional) se ejecuta en ese hilo sobre cada trozo nuevo, para dejar
+    construida su geometría antes de que haga falta.
+    """
+
+    def __init__(self, rng, prepare_chunk=None):
+        super().__init__(0, {'title': f'MODO INFINITO (semilla {rng.seed})',
+                             'player': [100, 500], 'width': ENDLESS_WIDTH})
+        self.endless = True
+        self.seed = rng.seed
+        self.reach = (1, 1)  # Nada sobresale más de un trozo
+        self.prepare_chunk = prepare_chunk
+        self.generator = ChunkGenerator(rng)
+        self.ready = queue.Queue(maxsize=ENDLESS_CHUNKS_AHEAD)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.produce, name='chunk-generator', daemon=True)
+        self.thread.start()
+
+
+    def produce(self):
+        while not self.stopped.is_set():
+            chunk = self.generator.next_chunk()
+            if self.prepare_chunk is not None:
+                self.prepare_chunk(chunk)
+            while not self.stopped.is_set():
+                try:
+                    self.ready.put(chunk, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def collect(self, last):
+        """Recoger en orden los trozos generados hasta el índice ``last``"""
+        while self.first_chunk + len(self.chunks) <= last:
+            self.chunks.append(self.ready.get())
+
+    def chunks_near(self, area):
+        self.collect((area.right - 1) // CHUNK_WIDTH + self.reach[0])
+        return super().chunks_near(area)
+
+    def close(self):
+        self.stopped.set()
@@ -1,40 +1,53 @@
 import pygame
 import math
-import random
 from config import *
+from utils.sprite_loader import load_sprite
+from spatial_hash import SpatialHash
+from collision import LANDED
+from projectiles import ProjectilePool
+from enemy_batch import FloaterBatch
 
 class Enemy(pygame.sprite.Sprite):
-    def __init__(self, x, y, enemy_type):
+    def __init__(self, x, y, enemy_type, wave_offset=0.0):
         super().__init__()
         self.enemy_type = enemy_type
         
         # Crear sprite VISIBLE
-        self.image = self.create_enemy_sprite(enemy_type)
+        self.image = load_sprite(f'enemy/{enemy_type}', lambda: self.create_enemy_sprite(enemy_type))
         self.rect = self.image.get_rect()
+        self.speed = ENEMY_SPEED
+        self.collider = None
+        self.batch = None  # FloaterBatch que lleva su IA (solo sombras)
+        self.manager = None  # EnemyManager al que avisar al morir
+        self.slot = None
+        if enemy_type == 'SHOOTER':
+            self.projectiles = None  # Pool compartido del nivel (lo asigna EnemyManager)
+        self.reset(x, y, wave_offset)
+
+    def reset(self, x, y, wave_offset=0.0):
+        """Estado inicial en (x, y); también al reciclarlo desde el pool"""
         self.rect.x = x
         self.rect.y = y
         
         # Movimiento
         self.vel_x = 0
         self.vel_y = 0
-        self.speed = ENEMY_SPEED
         
         # Estados
         self.direction = 1
         self.move_timer = 0
-        self.health = 3 if enemy_type == 'SHOOTER' else 1
+        self.health = 3 if self.enemy_type == 'SHOOTER' else 1
         self.on_ground = False  # ✅ NUEVO: Para colisiones
         
         # IA específica
-        if enemy_type == 'FLOATER':
-            self.wave_offset = random.uniform(0, 2 * math.pi)
+        if self.enemy_type == 'FLOATER':
+            self.wave_offset = wave_offset  # Fase de la onda (sale del registro del nivel)
             self.amplitude = 2
             self.frequency = 0.02
             
-        elif enemy_type == 'SHOOTER':
+        elif self.enemy_type == 'SHOOTER':
             self.shoot_timer = 0
             self.shoot_interval = 2000  # 2 segundos
-            self.projectiles = pygame.sprite.Group()
             
     def create_enemy_sprite(self, enemy_type):
         """Crear sprites VISIBLES para enemigos"""
@@ -61,56 +74,54 @@ class Enemy(pygame.sprite.Sprite):
         
         return surface
     
-    def update(self, player=None):
-        """Actualizar según tipo de enemigo"""
-        if self.enemy_type == 'FLOATER':
-            self.update_floater()
-        elif self.enemy_type == 'SHOOTER':
-            self.update_shooter(player)
+    def update(self, player=None, dt=1.0):
+        """Actualizar según tipo de enemigo (``dt`` en ticks base)"""
+        if self.batch is not None:
+            return  # La IA de las sombras la avanza FloaterBatch
+        start_y = self.rect.y
+        if self.enemy_type == 'SHOOTER':
+            self.update_shooter(player, dt)
             
         # ✅ CORREGIDO: Solo aplicar gravedad si no está en el suelo
         if not self.on_ground:
-            self.vel_y += PLAYER_GRAVITY * 0.3
+            self.vel_y += PLAYER_GRAVITY * 0.3 * dt
         else:
             self.vel_y = 0  # No caer si está en plataforma
             
-        self.rect.y += self.vel_y
+        self.rect.y += self.vel_y * dt
         self.on_ground = False  # Resetear para siguiente frame
+
+        if self.collider is not None:
+            # Repetir el desplazamiento vertical del tick como un barrido:
+            # los enemigos solo aterrizan (atraviesan las plataformas de lado)
+            dy = self.rect.y - start_y
+            self.rect.y = start_y
+            contact = self.collider.move_y(self.rect, dy, ceilings=False)
+            if contact == LANDED:
+                self.vel_y = 0
+                self.on_ground = True
         
-    def update_floater(self):
-        """IA para sombra flotante"""
-        self.move_timer += 1
-        
-        # Movimiento horizontal suave
-        self.rect.x += self.direction * self.speed * 0.7
-        
-        # Movimiento vertical sinusoidal (más pronunciado)
-        wave = math.sin(self.move_timer * self.frequency + self.wave_offset) * self.amplitude
-        self.rect.y += wave
-        
-        # Cambiar dirección cada 3 segundos (180 frames)
-        if self.move_timer % 180 == 0:
-            self.direction *= -1
-            
-        # Mantener en pantalla
-        if self.rect.left < 50:
-            self.direction = 1
-        if self.rect.right > SCREEN_WIDTH - 50:
-            self.direction = -1
-            
-    def update_shooter(self, player):
+    def update_shooter(self, player, dt=1.0):
         """IA para guardián tirador"""
         if player:
-            self.shoot_timer += 16  # Aprox 1 frame a 60 FPS
+            self.shoot_timer += 16 * dt  # Aprox 1 tick a 60 Hz
             
             # Disparar cada 2 segundos
             if self.shoot_timer >= self.shoot_interval:
                 self.shoot_timer = 0
                 self.shoot_projectile(player)
                 
+    def kill(self):
+        if self.batch is not None:
+            self.batch.remove(self)
+        was_alive = self.alive()
+        super().kill()
+        if was_alive and self.manager is not None:
+            self.manager.enemy_removed(self)
+
     def shoot_projectile(self, player):
         """Disparar proyectil hacia el jugador"""
-        if player:
+        if player and self.projectiles is not None:
             # Calcular dirección
             dx = player.rect.centerx - self.rect.centerx
             dy = player.rect.centery - self.rect.centery
@@ -120,66 +131,101 @@ class Enemy(pygame.sprite.Sprite):
             dx /= distance
             dy /= distance
             
-            projectile = Projectile(self.rect.centerx, self.rect.centery, dx, dy)
-            self.projectiles.add(projectile)
-            return projectile
-            
-    def draw_projectiles(self, screen):
-        """Dibujar proyectiles de este enemigo"""
-        self.projectiles.draw(screen)
-
-class Projectile(pygame.sprite.Sprite):
-    def __init__(self, x, y, dx, dy):
-        super().__init__()
-        self.image = pygame.Surface((12, 12), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, (255, 50, 50), (6, 6), 6)
-        pygame.draw.circle(self.image, (255, 150, 150), (6, 6), 3)
-        
-        self.rect = self.image.get_rect()
-        self.rect.centerx = x
-        self.rect.centery = y
-        
-        self.dx = dx * PROJECTILE_SPEED
-        self.dy = dy * PROJECTILE_SPEED
-        self.lifetime = 180
-        
-    def update(self):
-        self.rect.x += self.dx
-        self.rect.y += self.dy
-        self.lifetime -= 1
-        
-        if (self.rect.right < 0 or self.rect.left > SCREEN_WIDTH or
-            self.rect.bottom < 0 or self.rect.top > SCREEN_HEIGHT or
-            self.lifetime <= 0):
-            self.kill()
+            return self.projectiles.fire(self.rect.centerx, self.rect.centery, dx, dy)
 
 class EnemyManager:
-    def __init__(self):
+    def __init__(self, collider=None, on_removed=None):
         self.enemies = pygame.sprite.Group()
+        self.by_type = {'FLOATER': pygame.sprite.Group(), 'SHOOTER': pygame.sprite.Group()}
+        self.on_removed = on_removed  # Callback al morir un enemigo
+        self.individual_enemies = pygame.sprite.Group()  # IA sprite a sprite
+        self.index = SpatialHash()  # Solo enemigos individuales
+        self.collider = collider  # LevelCollider del nivel
+        self.projectiles = ProjectilePool()  # Compartido por todos los tiradores
+        self.floaters = FloaterBatch()  # IA vectorizada de las sombras
+        self.floaters.collider = collider
+        self.pool = {enemy_type: [] for enemy_type in self.by_type}  # Enemigos para reciclar
         
-    def spawn_enemy(self, x, y, enemy_type='FLOATER'):
-        enemy = Enemy(x, y, enemy_type)
+    def spawn_enemy(self, x, y, enemy_type='FLOATER', wave_offset=0.0):
+        free = self.pool.get(enemy_type)
+        if free:
+            enemy = free.pop()
+            enemy.reset(x, y, wave_offset)
+        else:
+            enemy = Enemy(x, y, enemy_type, wave_offset)
+        enemy.collider = self.collider
+        enemy.manager = self
         self.enemies.add(enemy)
+        self.by_type[enemy_type].add(enemy)
+        if enemy_type == 'FLOATER':
+            self.floaters.add(enemy)
+        else:
+            if enemy_type == 'SHOOTER':
+                enemy.projectiles = self.projectiles
+            self.individual_enemies.add(enemy)
+            self.index.insert(enemy)
         return enemy
         
-    def update(self, player=None):
-        self.enemies.update(player)
-        for enemy in self.enemies:
-            if hasattr(enemy, 'projectiles'):
-                enemy.projectiles.update()
+    def update(self, player=None, dt=1.0):
+        self.individual_enemies.update(player, dt)
+        self.floaters.update(dt)
+        self.projectiles.update(dt)
+
+    def enemy_removed(self, enemy):
+        """Aviso de Enemy.kill (los grupos por tipo ya se actualizaron)"""
+        if self.on_removed is not None:
+            self.on_removed(enemy)
+
+    def count(self, enemy_type):
+        return len(self.by_type[enemy_type])
+
+    def get_enemy_count(self):
+        return len(self.enemies)
+
+    def despawn(self, enemy):
+        """Retirar un enemigo sin contarlo como eliminado (su trozo deja de
+        estar activo) y devolver su registro (tipo, x, y, en_suelo, desfase_onda)"""
+        if enemy.batch is not None:
+            enemy.batch.sync(enemy)
+        enemy.manager = None
+        enemy.kill()
+        self.recycle(enemy)
+        return (enemy.enemy_type, enemy.rect.x, enemy.rect.y, enemy.on_ground,
+                getattr(enemy, 'wave_offset', 0.0))
+
+    def recycle(self, enemy):
+        """Guardar un enemigo ya retirado para reutilizarlo en otro spawn"""
+        if enemy.alive():
+            return
+        self.index.remove(enemy)
+        self.pool[enemy.enemy_type].append(enemy)
+
+    def sync_visible(self, previous, view=None):
+        """Poner al día los rect de los enemigos en lotes antes de dibujar"""
+        if view is not None:
+            self.floaters.bounds = view
+        self.floaters.sync_visible(previous)
                 
-    def draw_projectiles(self, screen):
-        for enemy in self.enemies:
-            if hasattr(enemy, 'projectiles'):
-                enemy.draw_projectiles(screen)
+    def draw_projectiles(self, screen, alpha=1.0, offset=(0, 0)):
+        return self.projectiles.draw(screen, alpha, offset)
                 
     def check_projectile_collisions(self, player):
-        for enemy in self.enemies:
-            if hasattr(enemy, 'projectiles'):
-                if pygame.sprite.spritecollide(player, enemy.projectiles, True):
-                    return True
-        return False
+        """Prueba AABB de todos los proyectiles contra el jugador (elimina los que impactan)"""
+        return self.projectiles.collide_rect(player.rect) > 0
+    
+    def refresh_index(self):
+        """Reubicar en el índice los enemigos que se movieron y quitar los eliminados"""
+        for enemy in self.index:
+            if enemy.alive():
+                self.index.update(enemy)
+            else:
+                self.index.remove(enemy)
+
+    def query(self, rect):
+        """Enemigos vivos que colisionan con un rectángulo"""
+        hits = [enemy for enemy in self.index.query(rect) if enemy.alive()]
+        return hits + self.floaters.query(rect)
     
     def check_collisions(self, player):
 
-        return pygame.sprite.spritecollide(player, self.enemies, False)
+        return self.query(player.rect)
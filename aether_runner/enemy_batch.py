@@ -0,0 +1,227 @@
+import zlib
+import numpy as np
+import pygame
+from config import *
+
+DENSE_LANDING_PAIRS = 512  # Hasta aquí (sombras × plataformas) se prueba la matriz completa
+
+class FloaterBatch:
+    """IA de todas las sombras flotantes (FLOATER) en arrays de NumPy
+
+    Cada sombra sigue siendo un sprite ``Enemy`` (imagen, grupos, ``kill``),
+    pero su estado de simulación (posición, dirección, temporizador, onda,
+    caída) vive en un hueco de estos arrays y se actualiza para todas a la
+    vez. Los ``rect`` de los sprites solo se sincronizan cuando hacen falta:
+    al dibujar (los visibles) y al devolverlos en una consulta de colisión.
+    """
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.sprites = []
+        self.pending = []  # Sombras añadidas que aún no tienen hueco
+        self.collider = None
+        self.level_width = SCREEN_WIDTH
+        self.bounds = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)  # Vista, para sincronizar
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """Reservar (o ampliar) los arrays conservando los huecos ocupados"""
+        fields = {
+            'x': np.float32, 'y': np.float32, 'prev_x': np.float32, 'prev_y': np.float32,
+            'width': np.float32, 'height': np.float32, 'direction': np.float32,
+            'timer': np.float32, 'wave_offset': np.float32, 'amplitude': np.float32,
+            'frequency': np.float32, 'vel_y': np.float32, 'on_ground': np.bool_,
+        }
+        for name, dtype in fields.items():
+            array = np.zeros(capacity, dtype=dtype)
+            if self.count:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self._arrays = tuple(getattr(self, name) for name in fields)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count + len(self.pending)
+
+    def add(self, enemy):
+        """Registrar una sombra; su estado se copia en el próximo tick (así se
+        respetan los ajustes de posición hechos tras crearla)"""
+        enemy.batch = self
+        self.pending.append(enemy)
+
+    def flush(self):
+        """Dar hueco a las sombras pendientes copiando su estado actual"""
+        if not self.pending:
+            return
+        needed = self.count + len(self.pending)
+        if needed > self.capacity:
+            self._allocate(max(needed, self.capacity * 2))
+
+        for enemy in self.pending:
+            i = self.count
+            enemy.slot = i
+            self.sprites.append(enemy)
+            self.x[i] = self.prev_x[i] = enemy.rect.x
+            self.y[i] = self.prev_y[i] = enemy.rect.y
+            self.width[i], self.height[i] = enemy.rect.size
+            self.direction[i] = enemy.direction
+            self.timer[i] = enemy.move_timer
+            self.wave_offset[i] = enemy.wave_offset
+            self.amplitude[i] = enemy.amplitude
+            self.frequency[i] = enemy.frequency
+            self.vel_y[i] = enemy.vel_y
+            self.on_ground[i] = enemy.on_ground
+            self.count = i + 1
+        self.pending = []
+
+    def remove(self, enemy):
+        """Liberar el hueco de una sombra (el último ocupa su lugar)"""
+        enemy.batch = None
+        if enemy in self.pending:
+            self.pending.remove(enemy)
+            return
+
+        i, last = enemy.slot, self.count - 1
+        if i != last:
+            for array in self._arrays:
+                array[i] = array[last]
+            moved = self.sprites[last]
+            moved.slot = i
+            self.sprites[i] = moved
+        self.sprites.pop()
+        self.count = last
+
+    def update(self, dt=1.0):
+        """Avanzar la IA de todas las sombras un tick"""
+        self.flush()
+        n = self.count
+        if n == 0:
+            return
+        step = dt * FLOATER_AI_STEPS
+
+        x, y = self.x[:n], self.y[:n]
+        width, height = self.width[:n], self.height[:n]
+        direction, timer = self.direction[:n], self.timer[:n]
+        vel_y, on_ground = self.vel_y[:n], self.on_ground[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+
+        # Movimiento horizontal suave y cambio de dirección cada 180 pasos
+        previous_timer = timer.copy()
+        timer += step
+        x += direction * (ENEMY_SPEED * 0.7 * step)
+        direction[previous_timer // 180 != timer // 180] *= -1
+
+        # Mantener dentro del nivel
+        direction[x < 50] = 1
+        direction[x + width > self.level_width - 50] = -1
+
+        # Onda sinusoidal más gravedad (solo si no está en el suelo)
+        wave = np.sin(timer * self.frequency[:n] + self.wave_offset[:n]) * self.amplitude[:n]
+        vel_y[:] = np.where(on_ground, 0, vel_y + PLAYER_GRAVITY * 0.3 * step)
+        dy = (wave + vel_y) * step
+
+        on_ground[:] = False
+        if self.collider is not None:
+            self._land(x, y, width, height, dy, vel_y, on_ground)
+        else:
+            y += dy
+
+    def _land(self, x, y, width, height, dy, vel_y, on_ground):
+        """Barrido vertical vectorizado: aterrizar sobre cualquier plataforma
+        que se cruce cayendo desde arriba
+
+        Con muchas sombras y plataformas, cada sombra solo se compara con las
+        plataformas fijas de sus columnas de la rejilla (``StaticFloors``);
+        las móviles, pocas, se comparan con todas.
+        """
+        falling = np.flatnonzero(dy >= 0)  # Solo se aterriza bajando
+        if len(falling) == 0:
+            y += dy
+            return
+        floor = np.full(len(x), np.inf, dtype=np.float32)
+        fx, fwidth = x[falling], width[falling]
+        bottom = y[falling] + height[falling]
+        new_bottom = bottom + dy[falling]
+
+        floors = self.collider.static_floors()
+        if len(fx) * len(floors) <= DENSE_LANDING_PAIRS:
+            # Pocos pares: la matriz completa sale más barata que filtrar
+            top = floors.top
+            crossing = ((fx[:, None] < floors.right) & (fx[:, None] + fwidth[:, None] > floors.left) &
+                        (top >= bottom[:, None]) & (top <= new_bottom[:, None]))
+            floor[falling] = np.where(crossing, top, np.inf).min(axis=1, initial=np.inf)
+        else:
+            pair, platform = floors.candidates(fx, fwidth)
+            top = floors.top[platform]
+            fx_pair = fx[pair]
+            crossing = ((fx_pair < floors.right[platform]) &
+                        (fx_pair + fwidth[pair] > floors.left[platform]) &
+                        (top >= bottom[pair]) & (top <= new_bottom[pair]))
+            np.minimum.at(floor, falling[pair[crossing]], top[crossing])
+
+        left, right, top, prev_top = self.collider.moving_floor_arrays()
+        if len(left):
+            crossing = ((fx[:, None] < right) & (fx[:, None] + fwidth[:, None] > left) &
+                        (prev_top >= bottom[:, None]) & (top <= new_bottom[:, None]))
+            floor[falling] = np.minimum(floor[falling], np.where(crossing, top, np.inf).min(axis=1))
+        landed = np.isfinite(floor)
+
+        y[:] = np.where(landed, floor - height, y + dy)
+        vel_y[landed] = 0
+        on_ground[:] = landed
+
+    def _sync(self, indices):
+        """Copiar al ``rect`` de los sprites indicados su posición actual"""
+        xs = self.x[indices].astype(np.int32).tolist()
+        ys = self.y[indices].astype(np.int32).tolist()
+        sprites = self.sprites
+        for i, x, y in zip(indices.tolist(), xs, ys):
+            sprites[i].rect.topleft = (x, y)
+
+    def sync(self, enemy):
+        """Copiar al sprite de una sombra todo su estado de simulación"""
+        if enemy.slot is None or enemy in self.pending:
+            return
+        i = enemy.slot
+        enemy.rect.topleft = (int(self.x[i]), int(self.y[i]))
+        enemy.direction = float(self.direction[i])
+        enemy.move_timer = float(self.timer[i])
+        enemy.vel_y = float(self.vel_y[i])
+        enemy.on_ground = bool(self.on_ground[i])
+
+    def checksum(self, crc=0):
+        """CRC32 del estado de las sombras (continúa ``crc``)"""
+        for array in self._arrays:
+            crc = zlib.crc32(array[:self.count], crc)
+        return crc
+
+    def _overlapping(self, rect):
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        return np.flatnonzero((x < rect.right) & (x + self.width[:n] > rect.left) &
+                              (y < rect.bottom) & (y + self.height[:n] > rect.top))
+
+    def query(self, rect):
+        """Sombras que colisionan con un rectángulo (con su ``rect`` al día)"""
+        self.flush()
+        if self.count == 0:
+            return []
+        indices = self._overlapping(rect)
+        self._sync(indices)
+        return [self.sprites[i] for i in indices.tolist()]
+
+    def sync_visible(self, previous):
+        """Sincronizar los ``rect`` de las sombras visibles (en ``bounds``) antes de dibujar
+
+        También se anota en ``previous`` su posición al inicio del tick para
+        que el renderizador pueda interpolar.
+        """
+        if self.count == 0:
+            return
+        indices = self._overlapping(self.bounds)
+        self._sync(indices)
+        xs = self.prev_x[indices].astype(np.int32).tolist()
+        ys = self.prev_y[indices].astype(np.int32).tolist()
+        for i, x, y in zip(indices.tolist(), xs, ys):
+            previous[self.sprites[i]] = (x, y)
@@ -1,10 +1,24 @@
 import pygame
-import sys
-import random
+import os
+import math
+import array
+import zlib
 from config import *
 from player import Player
-from items import ItemManager
-from enemies import EnemyManager
+from items import ItemManager, Item
+from enemies import EnemyManager, Enemy
+from utils.sprite_loader import load_sprite
+from utils.text_cache import render_text
+from utils.profiler import FrameProfiler
+from utils.rng import RandomService
+from renderer import create_renderer
+from controls import InputState, NO_INPUT
+from spatial_hash import SpatialHash
+from collision import LevelCollider
+from level_loader import LevelLoader, build_chunks
+from camera import Camera
+from streaming import LevelStream
+from endless import EndlessLevel
 
 class MovingPlatform(pygame.sprite.Sprite):
     def __init__(self, x, y, width, height, color, move_x=0, move_y=0, move_distance=100):
@@ -14,9 +28,12 @@ class MovingPlatform(pygame.sprite.Sprite):
         self.rect.x = x
         self.rect.y = y
         
-        # Movimiento
+        # Movimiento (posición con decimales: el Rect se deriva de ella, así
+        # que el recorrido no depende de la frecuencia de ticks)
         self.start_x = x
         self.start_y = y
+        self.pos_x = float(x)
+        self.pos_y = float(y)
         self.move_x = move_x
         self.move_y = move_y
         self.move_distance = move_distance
@@ -24,6 +41,11 @@ class MovingPlatform(pygame.sprite.Sprite):
         self.speed = 2
 
     def create_platform_surface(self, width, height, base_color):
+        """Obtener superficie de plataforma móvil (atlas o procedural)"""
+        key = 'moving_platform/{}x{}/{}_{}_{}'.format(width, height, *base_color)
+        return load_sprite(key, lambda: self.draw_platform_surface(width, height, base_color))
+
+    def draw_platform_surface(self, width, height, base_color):
         """Crear superficie de plataforma móvil"""
         surface = pygame.Surface((width, height), pygame.SRCALPHA)
         pygame.draw.rect(surface, base_color, (0, 0, width, height), border_radius=6)
@@ -42,17 +64,19 @@ class MovingPlatform(pygame.sprite.Sprite):
             
         return surface
 
-    def update(self):
+    def update(self, dt=1.0):
         # Movimiento horizontal
         if self.move_x != 0:
-            self.rect.x += self.move_x * self.speed * self.direction
-            if abs(self.rect.x - self.start_x) > self.move_distance:
+            self.pos_x += self.move_x * self.speed * self.direction * dt
+            self.rect.x = math.floor(self.pos_x)
+            if abs(self.pos_x - self.start_x) > self.move_distance:
                 self.direction *= -1
         
         # Movimiento vertical
         if self.move_y != 0:
-            self.rect.y += self.move_y * self.speed * self.direction
-            if abs(self.rect.y - self.start_y) > self.move_distance:
+            self.pos_y += self.move_y * self.speed * self.direction * dt
+            self.rect.y = math.floor(self.pos_y)
+            if abs(self.pos_y - self.start_y) > self.move_distance:
                 self.direction *= -1
 
 class OneWayPlatform(pygame.sprite.Sprite):
@@ -64,6 +88,11 @@ class OneWayPlatform(pygame.sprite.Sprite):
         self.rect.y = y
 
     def create_one_way_surface(self, width, height, base_color):
+        """Obtener superficie de plataforma de un solo sentido (atlas o procedural)"""
+        key = 'one_way_platform/{}x{}/{}_{}_{}'.format(width, height, *base_color)
+        return load_sprite(key, lambda: self.draw_one_way_surface(width, height, base_color))
+
+    def draw_one_way_surface(self, width, height, base_color):
         """Crear superficie de plataforma de un solo sentido"""
         surface = pygame.Surface((width, height), pygame.SRCALPHA)
         pygame.draw.rect(surface, base_color, (0, 0, width, height), border_radius=6)
@@ -81,20 +110,61 @@ class OneWayPlatform(pygame.sprite.Sprite):
             
         return surface
 
+STAR_FIELDS = ('x', 'y', 'speed', 'size', 'brightness')
+STATE_NAMES = {PLAYING: 'jugando', LEVEL_COMPLETE: 'nivel_completado', GAME_OVER: 'game_over'}
+
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False, tick_rate=TICK_RATE, endless_seed=None, frame_csv=None,
+                 seed=None, start_level=1):
+        # Modo sin ventana: driver de vídeo/audio ficticio y simulación vía step()
+        self.headless = headless
+        
+        # Semilla de la partida (aleatoria si no se da): todo el azar sale de
+        # ella, con flujos separados para la simulación y para lo cosmético.
+        # En el modo infinito es la semilla del recorrido
+        self.rng = RandomService(endless_seed if endless_seed is not None else seed)
+        self.seed = self.rng.seed
+        self.recorder = None  # ReplayRecorder que guarda los controles de cada tick
+        self.capture = None  # SegmentProfiler (cProfile por nivel y estado), si se pide
+        
+        # Tiempos por etapa de cada frame (F3); CSV con todos los frames al salir
+        self.profiler = FrameProfiler(enabled=not headless, record=frame_csv is not None)
+        self.frame_csv = frame_csv
+        
+        # Modo infinito: trozos generados a partir de la semilla
+        self.endless_seed = endless_seed
+        
+        # Simulación a paso fijo: dt en ticks base (1.0 a 60 Hz)
+        self.tick_rate = tick_rate
+        self.dt = BASE_TICK_RATE / tick_rate
+        self.previous_positions = {}
+        if headless:
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+            os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Aether Runner - Nivel 1")
+        pygame.display.set_caption(f"Aether Runner - Nivel {start_level}" if endless_seed is None else
+                                   f"Aether Runner - Infinito (semilla {endless_seed})")
         self.clock = pygame.time.Clock()
+        self.renderer = create_renderer(self.screen)
+        
+        # Fondos translúcidos del HUD y de las pantallas de fin (se crean una vez)
+        self.hud_background = pygame.Surface((200, 40), pygame.SRCALPHA)
+        self.hud_background.fill((0, 0, 0, 128))
+        self.screen_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.screen_overlay.fill((0, 0, 0, 128))
         
         # Cargar sonidos
+        self.inputs = NO_INPUT
         self.load_sounds()
         
         # Estado del juego
-        self.current_level = 1
+        self.current_level = start_level
         self.game_state = PLAYING
         self.level_completed = False
+        self.level_loader = LevelLoader(self.prepare_level)
+        self.level = None
         
         # Inicializar sistemas
         self.reset_game()
@@ -103,6 +173,11 @@ class Game:
 
     def load_sounds(self):
         """Cargar efectos de sonido y música"""
+        if self.headless:
+            self.jump_sound = self.attack_sound = self.collect_sound = None
+            self.hurt_sound = self.enemy_death_sound = self.level_complete_sound = None
+            return
+        
         try:
             # Efectos de sonido
             self.jump_sound = pygame.mixer.Sound("assets/sounds/jump.wav") if pygame.mixer else None
@@ -142,29 +217,92 @@ class Game:
         self.platforms = pygame.sprite.Group()
         self.solid_platforms = pygame.sprite.Group()  # Plataformas sólidas
         self.one_way_platforms = pygame.sprite.Group()  # Plataformas de un solo sentido
+        self.static_platforms = pygame.sprite.Group()  # Geometría fija (capa estática)
+        
+        # Índice espacial de plataformas y colisionador del nivel: las fijas
+        # se insertan una vez por nivel, las móviles se reubican en cada tick
+        self.platform_index = SpatialHash()
+        self.collider = LevelCollider(self.platform_index, self.solid_platforms,
+                                      self.one_way_platforms)
         
         # Sistemas
         self.item_manager = ItemManager()
-        self.enemy_manager = EnemyManager()
-        
-        # Crear nivel según el nivel actual
-        if self.current_level == 1:
-            self.create_level_1()
-        elif self.current_level == 2:
-            self.create_level_2()
-        elif self.current_level == 3:
-            self.create_level_3()
-        elif self.current_level == 4:
-            self.create_level_4()  # ✅ NIVEL 4 CORREGIDO
-        elif self.current_level == 5:
-            self.create_level_5()
-        elif self.current_level == 6:
-            self.create_level_6()
-        
-        # Estrellas de fondo
-        self.stars = self.create_stars()
+        self.enemy_manager = EnemyManager(self.collider)
+        
+        # Crear nivel desde su archivo (ya preparado si se precargó). Cada
+        # intento parte del estado inicial inmutable de sus trozos
+        if self.level is not None:
+            self.level.close()
+        if self.endless_seed is not None:
+            level = EndlessLevel(self.rng, self.build_chunk)
+        else:
+            level = self.level_loader.load(self.current_level)
+        self.level = level
+        self.player = Player(*level.data['player'], rng=self.rng.particles)
+        self.player.collider = self.collider
+        self.player.level_width = level.width
+        self.all_sprites.add(self.player)
+        self.enemy_manager.floaters.level_width = level.width
+        
+        # Cámara y trozos activos alrededor de la posición inicial. La de la
+        # simulación solo se mueve en ``update_camera``; el dibujado usa otra
+        # que sigue la posición interpolada, así que dibujar no cambia la partida
+        self.camera = Camera(level.width)
+        self.camera.follow(self.player.rect.centerx)
+        self.render_camera = Camera(level.width)
+        self.renderer.set_camera(self.render_camera.follow(self.player.rect.centerx))
+        self.stream = LevelStream(self, level)
+        self.stream.update(self.camera.view)
+        self.enemy_manager.projectiles.bounds.update(self.camera.view)
+        self.on_chunks_changed()
+        
+        if level.stars is None:
+            level.stars = tuple(tuple(star[field] for field in STAR_FIELDS)
+                                for star in self.create_stars(level.number))
+        self.stars = [dict(zip(STAR_FIELDS, star)) for star in level.stars]
+        
+        # La victoria se vigila una vez poblado el nivel
+        self.item_manager.on_removed = self.on_level_progress
+        self.enemy_manager.on_removed = self.on_level_progress
+        
+        self.previous_positions = {}
+        self.renderer.invalidate()
+
+    def on_chunks_changed(self):
+        """Poner al día lo que depende de los trozos activos"""
+        self.moving_platforms = [platform for platform in self.platforms
+                                 if isinstance(platform, MovingPlatform)]
+        self.collider.set_moving_platforms(self.moving_platforms)
+        self.renderer.set_static_layers(self.stream.static_layers())
+        # El modo infinito descarta los trozos de muy atrás: no se puede volver a ellos
+        self.camera.left = self.render_camera.left = self.player.level_left = self.level.left
+
+    def update_camera(self):
+        """Seguir al jugador y activar/retirar los trozos según la vista"""
+        self.camera.follow(self.player.rect.centerx)
+        if self.stream.update(self.camera.view):
+            self.on_chunks_changed()
+        self.enemy_manager.projectiles.bounds.update(self.camera.view)
+
+    def build_static_layer(self, platforms, left=0, width=SCREEN_WIDTH):
+        """Componer la geometría fija de un trozo (desde ``left``) en una superficie
+
+        La capa se guarda con alfa premultiplicado para que al dibujarla sobre
+        el fondo el resultado sea idéntico a dibujar cada plataforma por separado.
+        """
+        layer = pygame.Surface((width, SCREEN_HEIGHT), pygame.SRCALPHA)
+        layer.fill((0, 0, 0, 0))
+        for platform in platforms:
+            layer.blit(platform.image.premul_alpha(), platform.rect.move(-left, 0),
+                       special_flags=pygame.BLEND_PREMULTIPLIED)
+        return layer
 
     def create_platform_surface(self, width, height, base_color):
+        """Obtener superficie de plataforma normal (atlas o procedural)"""
+        key = 'platform/{}x{}/{}_{}_{}'.format(width, height, *base_color)
+        return load_sprite(key, lambda: self.draw_platform_surface(width, height, base_color))
+
+    def draw_platform_surface(self, width, height, base_color):
         """Crear superficie de plataforma normal"""
         surface = pygame.Surface((width, height), pygame.SRCALPHA)
         pygame.draw.rect(surface, base_color, (0, 0, width, height), border_radius=8)
@@ -181,525 +319,188 @@ class Game:
             
         return surface
 
-    def create_level_1(self):
-        """Nivel 1 - Introducción"""
-        print("🔧 CREANDO NIVEL 1 - INTRODUCCIÓN")
-        
-        # Crear jugador
-        self.player = Player(100, 300)
-        self.all_sprites.add(self.player)
-        
-        # Plataforma base sólida
-        platform = pygame.sprite.Sprite()
-        platform.image = self.create_platform_surface(SCREEN_WIDTH, 30, PLATFORM_COLOR)
-        platform.rect = platform.image.get_rect()
-        platform.rect.x = 0
-        platform.rect.y = SCREEN_HEIGHT - 30
-        self.all_sprites.add(platform)
-        self.platforms.add(platform)
-        self.solid_platforms.add(platform)
-        
-        # Plataformas flotantes normales
-        platforms_data = [
-            (200, 550, 150, 20), (400, 550, 150, 20), (600, 550, 150, 20), (800, 550, 150, 20),
-            (650, 450, 200, 20), (450, 450, 150, 20), (250, 450, 150, 20),
-            (500, 350, 120, 20), (700, 350, 120, 20),
-            (600, 250, 100, 20), (400, 250, 100, 20),
-            (500, 150, 80, 20)
-        ]
-        
-        for x, y, width, height in platforms_data:
+    def prepare_level(self, level):
+        """Colocar las entidades y repartir el nivel en trozos (puede
+        ejecutarse en el hilo de precarga: no toca el estado del juego)"""
+        data = level.data
+        color = tuple(data.get('platform_color', PLATFORM_COLOR))
+        solid_rows = [(x, y, width, height, color) for x, y, width, height in level.rows('platforms')]
+        color = tuple(data.get('one_way_color', PLATFORM_COLOR))
+        one_way_rows = [(x, y, width, height, color)
+                        for x, y, width, height in level.rows('one_way_platforms')]
+        color = tuple(data.get('moving_color', PLATFORM_COLOR))
+        speed = data.get('moving_speed', 2)
+        moving_rows = [(x, y, width, height, color, move_x, move_y, distance, speed)
+                       for x, y, width, height, move_x, move_y, distance in level.rows('moving_platforms')]
+        
+        # Las entidades se apoyan en la posición inicial de todas las plataformas
+        platform_rects = [pygame.Rect(row[:4]) for row in solid_rows + one_way_rows + moving_rows]
+        enemies, items = self.populate_level(level, platform_rects)
+        level.set_chunks(build_chunks(level.width, solid_rows, one_way_rows, moving_rows, enemies, items))
+        
+        # La geometría de la vista inicial queda construida de antemano
+        view = Camera(level.width)
+        view.follow(level.data['player'][0])
+        for chunk in level.chunks_near(view.view.inflate(2 * CHUNK_ACTIVATE_MARGIN, 0)):
+            self.build_chunk(chunk)
+
+    def build_chunk(self, chunk):
+        """Construir los sprites de las plataformas fijas de un trozo y su capa"""
+        chunk.solid_platforms = []
+        for x, y, width, height, color in chunk.solid_rows:
             platform = pygame.sprite.Sprite()
-            platform.image = self.create_platform_surface(width, height, PLATFORM_COLOR)
-            platform.rect = platform.image.get_rect()
-            platform.rect.x = x
-            platform.rect.y = y
-            self.all_sprites.add(platform)
-            self.platforms.add(platform)
-            self.solid_platforms.add(platform)
-        
-        # Enemigos básicos
-        enemy_positions = [
-            (300, 520, 'FLOATER'), (600, 520, 'FLOATER'), 
-            (500, 320, 'SHOOTER'), (350, 220, 'FLOATER'), (650, 220, 'FLOATER')
-        ]
-        
-        for x, y, enemy_type in enemy_positions:
-            enemy = self.enemy_manager.spawn_enemy(x, y, enemy_type)
-            if enemy:
-                self.all_sprites.add(enemy)
-                self.position_enemy_on_platform(enemy)
-        
-        # Fragmentos
-        fragment_positions = [
-            (220, 520), (820, 520), (500, 420), (300, 420), (700, 420),
-            (520, 320), (720, 320), (450, 220), (650, 220), (540, 120)
-        ]
-        
-        for x, y in fragment_positions:
-            item = self.item_manager.spawn_item(x, y, 'FRAGMENT')
-            if item:
-                self.position_item_on_platform(item)
-        
-        # Power-ups
-        powerup_positions = [
-            (850, 520, 'INVINCIBILITY'), (700, 320, 'JUMP_BOOST'), (250, 220, 'MAGNET')
-        ]
-        
-        for x, y, powerup_type in powerup_positions:
-            self.item_manager.spawn_item(x, y, powerup_type)
-
-    def create_level_2(self):
-        """Nivel 2 - Plataformas móviles"""
-        print("🔧 CREANDO NIVEL 2 - PLATAFORMAS MÓVILES")
-        
-        self.player = Player(100, 500)
-        self.all_sprites.add(self.player)
-        
-        # Plataforma base
-        platform = pygame.sprite.Sprite()
-        platform.image = self.create_platform_surface(SCREEN_WIDTH, 30, (100, 150, 200))
-        platform.rect = platform.image.get_rect()
-        platform.rect.x = 0
-        platform.rect.y = SCREEN_HEIGHT - 30
-        self.all_sprites.add(platform)
-        self.platforms.add(platform)
-        self.solid_platforms.add(platform)
-        
-        # Plataformas móviles
-        moving_platforms = [
-            # (x, y, width, height, color, move_x, move_y, distance)
-            (200, 550, 120, 15, (150, 100, 200), 1, 0, 100),
-            (500, 550, 120, 15, (150, 100, 200), 1, 0, 150),
-            (350, 450, 100, 15, (150, 100, 200), 0, 1, 80),
-            (600, 450, 100, 15, (150, 100, 200), 0, 1, 60),
-            (450, 350, 80, 15, (150, 100, 200), 1, 0, 120),
-            (250, 250, 80, 15, (150, 100, 200), 0, 1, 100),
-            (650, 250, 80, 15, (150, 100, 200), 1, 0, 80)
-        ]
-        
-        for data in moving_platforms:
-            platform = MovingPlatform(*data)
-            self.all_sprites.add(platform)
-            self.platforms.add(platform)
-            self.solid_platforms.add(platform)
+            platform.image = self.create_platform_surface(width, height, color)
+            platform.rect = platform.image.get_rect(topleft=(x, y))
+            chunk.solid_platforms.append(platform)
+        chunk.one_way_platforms = [OneWayPlatform(*row) for row in chunk.one_way_rows]
+        
+        # Calentar la caché de sprites de las plataformas móviles
+        for x, y, width, height, color, *_ in chunk.moving_rows:
+            MovingPlatform(x, y, width, height, color)
+        
+        platforms = chunk.solid_platforms + chunk.one_way_platforms
+        if platforms:
+            chunk.layer = self.build_static_layer(platforms, chunk.left, chunk.right - chunk.left)
+
+    def create_moving_platform(self, x, y, width, height, color, move_x, move_y, distance, speed):
+        platform = MovingPlatform(x, y, width, height, color, move_x, move_y, distance)
+        platform.speed = speed
+        return platform
+
+    def spawn_enemy_record(self, record):
+        """Crear un enemigo a partir de su registro (tipo, x, y, en_suelo, desfase_onda)"""
+        enemy_type, x, y, on_ground, wave_offset = record
+        enemy = self.enemy_manager.spawn_enemy(x, y, enemy_type, wave_offset)
+        enemy.on_ground = on_ground
+        self.all_sprites.add(enemy)
+        return enemy
+
+    def populate_level(self, level, platforms):
+        """Colocar enemigos, fragmentos y power-ups sobre las plataformas y
+        devolver sus registros iniciales"""
+        print(f"🔧 CREANDO NIVEL {level.number} - {level.title}")
+        strict = level.strict_placement
+        # Flujo propio del nivel: igual aunque se prepare en el hilo de precarga
+        rng = self.rng.gameplay_stream('nivel', level.number)
         
         # Enemigos
-        enemy_positions = [
-            (300, 520, 'SHOOTER'), (600, 520, 'SHOOTER'), (450, 420, 'FLOATER'),
-            (300, 320, 'SHOOTER'), (600, 320, 'SHOOTER'), (450, 220, 'FLOATER'),
-            (200, 170, 'FLOATER'), (700, 170, 'FLOATER')
-        ]
-        
-        for x, y, enemy_type in enemy_positions:
-            enemy = self.enemy_manager.spawn_enemy(x, y, enemy_type)
-            if enemy:
-                self.all_sprites.add(enemy)
-                self.position_enemy_on_platform(enemy)
-        
-        # Fragmentos en plataformas móviles
-        fragment_positions = [
-            (180, 520), (380, 520), (580, 520), (780, 520),
-            (270, 420), (470, 420), (670, 420), (370, 320),
-            (570, 320), (470, 220), (220, 170), (720, 170), (480, 90)
-        ]
-        
-        for x, y in fragment_positions:
-            item = self.item_manager.spawn_item(x, y, 'FRAGMENT')
-            if item:
-                self.position_item_on_platform(item)
-        
-        # Power-ups
-        powerup_positions = [
-            (800, 520, 'SPEED_BOOST'), (400, 320, 'INVINCIBILITY'),
-            (650, 170, 'JUMP_BOOST'), (250, 170, 'MAGNET')
-        ]
-        
-        for x, y, powerup_type in powerup_positions:
-            self.item_manager.spawn_item(x, y, powerup_type)
-
-    def create_level_3(self):
-        """Nivel 3 - Plataformas de un solo sentido"""
-        print("🔧 CREANDO NIVEL 3 - PLATAFORMAS DE UN SOLO SENTIDO")
-        
-        self.player = Player(100, 500)
-        self.all_sprites.add(self.player)
-        
-        # Plataforma base
-        platform = pygame.sprite.Sprite()
-        platform.image = self.create_platform_surface(SCREEN_WIDTH, 30, (150, 100, 200))
-        platform.rect = platform.image.get_rect()
-        platform.rect.x = 0
-        platform.rect.y = SCREEN_HEIGHT - 30
-        self.all_sprites.add(platform)
-        self.platforms.add(platform)
-        self.solid_platforms.add(platform)
-        
-        # Plataformas de un solo sentido (verdes)
-        one_way_platforms = [
-            (200, 550, 150, 10), (400, 550, 150, 10), (600, 550, 150, 10), (800, 550, 150, 10),
-            (300, 450, 120, 10), (500, 450, 120, 10), (700, 450, 120, 10),
-            (400, 350, 100, 10), (600, 350, 100, 10),
-            (500, 250, 80, 10), (300, 200, 80, 10), (700, 200, 80, 10),
-            (450, 150, 60, 10)
-        ]
-        
-        for x, y, width, height in one_way_platforms:
-            platform = OneWayPlatform(x, y, width, height, (100, 200, 100))
-            self.all_sprites.add(platform)
-            self.platforms.add(platform)
-            self.one_way_platforms.add(platform)
-        
-        # Enemigos más agresivos
-        enemy_positions = [
-            (150, 520, 'SHOOTER'), (450, 520, 'SHOOTER'), (750, 520, 'SHOOTER'),
-            (250, 420, 'SHOOTER'), (550, 420, 'SHOOTER'), (350, 320, 'FLOATER'),
-            (650, 320, 'FLOATER'), (450, 220, 'FLOATER'), (180, 170, 'SHOOTER'), (680, 170, 'SHOOTER')
-        ]
-        
-        for x, y, enemy_type in enemy_positions:
-            enemy = self.enemy_manager.spawn_enemy(x, y, enemy_type)
-            if enemy:
-                self.all_sprites.add(enemy)
-                self.position_enemy_on_platform(enemy)
+        enemies = []
+        for x, y, enemy_type in level.rows('enemies'):
+            enemy = Enemy(x, y, enemy_type, rng.uniform(0, 2 * math.pi))
+            if self.position_enemy_on_platform(enemy, platforms):
+                enemies.append(enemy)
+            elif strict:
+                # Si no se pudo posicionar, descartar el enemigo
+                print(f"⚠️ Enemigo en posición inválida: ({x}, {y})")
+            else:
+                enemies.append(enemy)
+        if strict:
+            print(f"👾 Enemigos colocados en nivel {level.number}: {len(enemies)}")
         
         # Fragmentos
-        fragment_positions = [
-            (50, 520), (350, 520), (650, 520), (130, 420), (430, 420), (730, 420),
-            (230, 320), (530, 320), (330, 220), (630, 220), (430, 120), (180, 70), (680, 70)
-        ]
-        
-        for x, y in fragment_positions:
-            item = self.item_manager.spawn_item(x, y, 'FRAGMENT')  # ✅ CORREGIDO: 'FRAGMENT' -> 'FRAGMENT'
-            if item:
-                self.position_item_on_platform(item)
-        
-        # Power-ups
-        powerup_positions = [
-            (50, 520, 'INVINCIBILITY'), (730, 420, 'SPEED_BOOST'),
-            (330, 220, 'JUMP_BOOST'), (630, 220, 'MAGNET'), (430, 120, 'INVINCIBILITY')
-        ]
-        
-        for x, y, powerup_type in powerup_positions:
-            self.item_manager.spawn_item(x, y, powerup_type)
-
-    def create_level_4(self):
-        """Nivel 4 - Combinación móvil + un solo sentido - CORREGIDO"""
-        print("🔧 CREANDO NIVEL 4 - HÍBRIDO CORREGIDO")
-        
-        self.player = Player(100, 500)
-        self.all_sprites.add(self.player)
-        
-        # Plataforma base
-        platform = pygame.sprite.Sprite()
-        platform.image = self.create_platform_surface(SCREEN_WIDTH, 30, (200, 100, 150))
-        platform.rect = platform.image.get_rect()
-        platform.rect.x = 0
-        platform.rect.y = SCREEN_HEIGHT - 30
-        self.all_sprites.add(platform)
-        self.platforms.add(platform)
-        self.solid_platforms.add(platform)
-        
-        # ✅ PLATAFORMAS MÓVILES CORREGIDAS - asegurar que sean sólidas
-        moving_platforms = [
-            # (x, y, width, height, color, move_x, move_y, distance)
-            (150, 550, 100, 15, (180, 120, 200), 1, 0, 120),
-            (450, 550, 100, 15, (180, 120, 200), 0, 1, 100),
-            (750, 550, 100, 15, (180, 120, 200), 1, 0, 80),
-            (300, 450, 80, 15, (180, 120, 200), 1, 1, 90),
-            (600, 450, 80, 15, (180, 120, 200), 0, 1, 110)
-        ]
-        
-        for data in moving_platforms:
-            platform = MovingPlatform(*data)
-            self.all_sprites.add(platform)
-            self.platforms.add(platform)
-            self.solid_platforms.add(platform)  # ✅ Asegurar que sean sólidas
-        
-        # ✅ PLATAFORMAS DE UN SOLO SENTIDO CORREGIDAS
-        one_way_platforms = [
-            (200, 400, 120, 10), (500, 400, 120, 10), 
-            (350, 300, 100, 10), (650, 300, 100, 10), 
-            (450, 200, 80, 10), (250, 150, 70, 10), (700, 150, 70, 10)
-        ]
-        
-        for x, y, width, height in one_way_platforms:
-            platform = OneWayPlatform(x, y, width, height, (100, 200, 150))
-            self.all_sprites.add(platform)
-            self.platforms.add(platform)
-            self.one_way_platforms.add(platform)
-        
-        # ✅ ENEMIGOS CON POSICIONES MÁS PRECISAS
-        enemy_positions = [
-            (200, 520, 'SHOOTER'), (500, 520, 'SHOOTER'), (800, 520, 'SHOOTER'),
-            (350, 420, 'FLOATER'), (650, 420, 'FLOATER'), 
-            (450, 320, 'SHOOTER'), (300, 220, 'FLOATER'), 
-            (600, 220, 'FLOATER'), (200, 120, 'SHOOTER'), (700, 120, 'SHOOTER')
-        ]
-        
-        enemy_count = 0
-        for x, y, enemy_type in enemy_positions:
-            enemy = self.enemy_manager.spawn_enemy(x, y, enemy_type)
-            if enemy:
-                self.all_sprites.add(enemy)
-                if self.position_enemy_on_platform(enemy):
-                    enemy_count += 1
-                else:
-                    # Si no se pudo posicionar, eliminar el enemigo
-                    enemy.kill()
-                    print(f"⚠️ Enemigo en posición inválida: ({x}, {y})")
-        
-        print(f"👾 Enemigos colocados en nivel 4: {enemy_count}")
-        
-        # ✅ FRAGMENTOS CON VERIFICACIÓN DE COLOCACIÓN
-        fragment_positions = [
-            (180, 520), (480, 520), (780, 520), 
-            (330, 420), (630, 420), (470, 320), 
-            (320, 220), (620, 220), (220, 120), 
-            (720, 120), (450, 180), (300, 80), (600, 80)
-        ]
-        
+        items = []
         fragment_count = 0
-        for x, y in fragment_positions:
-            item = self.item_manager.spawn_item(x, y, 'FRAGMENT')  # ✅ CORREGIDO: 'FRAGMENT' -> 'FRAGMENT'
+        for x, y in level.rows('fragments'):
+            item = self.create_item(x, y, 'FRAGMENT')
             if item:
-                if self.position_item_on_platform(item):
+                if self.position_item_on_platform(item, platforms):
                     fragment_count += 1
-                else:
-                    # Si no se pudo posicionar, eliminar el item
-                    item.kill()
+                elif strict:
+                    # Si no se pudo posicionar, descartar el item
                     print(f"⚠️ Fragmento en posición inválida: ({x}, {y})")
-        
-        print(f"🔵 Fragmentos colocados en nivel 4: {fragment_count}")
-        
-        # ✅ POWER-UPS ESENCIALES
-        powerup_positions = [
-            (800, 520, 'INVINCIBILITY'), (400, 320, 'SPEED_BOOST'),
-            (650, 220, 'JUMP_BOOST'), (250, 120, 'MAGNET')
-        ]
-        
-        for x, y, powerup_type in powerup_positions:
-            item = self.item_manager.spawn_item(x, y, powerup_type)
-            if item:
-                self.position_item_on_platform(item)
-        
-        # ✅ VERIFICACIÓN FINAL
-        total_enemies = len(self.enemy_manager.enemies)
-        total_fragments = self.item_manager.get_fragment_count()
-        total_items = len(self.item_manager.items)
-        
-        print(f"🎯 NIVEL 4 VERIFICACIÓN: {total_enemies} enemigos, {total_fragments} fragmentos, {total_items} items totales")
-        
-        if total_fragments == 0:
-            print("❌ ERROR: No hay fragmentos en el nivel 4!")
-            # Crear fragmentos de emergencia
-            emergency_positions = [(100, 520), (900, 520), (450, 320)]
-            for x, y in emergency_positions:
-                item = self.item_manager.spawn_item(x, y, 'FRAGMENT')  # ✅ CORREGIDO: 'FRAGMENT' -> 'FRAGMENT'
-                if item:
-                    self.position_item_on_platform(item)
-            print("🆘 Fragmentos de emergencia creados")
-
-    def create_level_5(self):
-        """Nivel 5 - Desafío extremo"""
-        print("🔧 CREANDO NIVEL 5 - DESAFÍO EXTREMO")
-        
-        self.player = Player(50, 500)
-        self.all_sprites.add(self.player)
-        
-        # Plataforma base pequeña
-        platform = pygame.sprite.Sprite()
-        platform.image = self.create_platform_surface(200, 20, (150, 80, 180))
-        platform.rect = platform.image.get_rect()
-        platform.rect.x = 0
-        platform.rect.y = SCREEN_HEIGHT - 30
-        self.all_sprites.add(platform)
-        self.platforms.add(platform)
-        self.solid_platforms.add(platform)
-        
-        # Plataformas móviles complejas
-        moving_platforms = [
-            (100, 550, 80, 10, (160, 100, 220), 1, 0, 200),
-            (400, 550, 80, 10, (160, 100, 220), 0, 1, 150),
-            (700, 550, 80, 10, (160, 100, 220), 1, 1, 120),
-            (250, 450, 60, 10, (160, 100, 220), 1, 0, 180),
-            (550, 450, 60, 10, (160, 100, 220), 0, 1, 130),
-            (350, 350, 50, 10, (160, 100, 220), 1, 1, 100),
-            (650, 350, 50, 10, (160, 100, 220), 1, 0, 160),
-            (450, 250, 40, 10, (160, 100, 220), 0, 1, 140),
-            (200, 200, 40, 10, (160, 100, 220), 1, 0, 120),
-            (700, 200, 40, 10, (160, 100, 220), 0, 1, 110),
-            (300, 150, 30, 10, (160, 100, 220), 1, 1, 90),
-            (600, 150, 30, 10, (160, 100, 220), 1, 0, 80)
-        ]
-        
-        for data in moving_platforms:
-            platform = MovingPlatform(*data)
-            self.all_sprites.add(platform)
-            self.platforms.add(platform)
-            self.solid_platforms.add(platform)
-        
-        # Enemigos muy agresivos
-        enemy_positions = [
-            (150, 520, 'SHOOTER'), (450, 520, 'SHOOTER'), (750, 520, 'SHOOTER'),
-            (300, 420, 'SHOOTER'), (600, 420, 'SHOOTER'), (150, 320, 'FLOATER'),
-            (450, 320, 'FLOATER'), (750, 320, 'FLOATER'), (300, 220, 'SHOOTER'),
-            (600, 220, 'SHOOTER'), (150, 120, 'FLOATER'), (450, 120, 'FLOATER'), (750, 120, 'FLOATER')
-        ]
-        
-        for x, y, enemy_type in enemy_positions:
-            enemy = self.enemy_manager.spawn_enemy(x, y, enemy_type)
-            if enemy:
-                self.all_sprites.add(enemy)
-                self.position_enemy_on_platform(enemy)
-        
-        # Fragmentos bien escondidos
-        fragment_positions = [
-            (130, 520), (430, 520), (730, 520), (280, 420), (580, 420),
-            (130, 320), (430, 320), (730, 320), (280, 220), (580, 220),
-            (130, 120), (430, 120), (730, 120), (450, 80), (300, 80), (600, 80)
-        ]
-        
-        for x, y in fragment_positions:
-            item = self.item_manager.spawn_item(x, y, 'FRAGMENT')  # ✅ CORREGIDO: 'FRAGMENT' -> 'FRAGMENT'
-            if item:
-                self.position_item_on_platform(item)
-
-    def create_level_6(self):
-        """Nivel 6 - Jefe final"""
-        print("🔧 CREANDO NIVEL 6 - JEFE FINAL")
-        
-        self.player = Player(SCREEN_WIDTH // 2, 500)
-        self.all_sprites.add(self.player)
-        
-        # Plataforma principal grande
-        platform = pygame.sprite.Sprite()
-        platform.image = self.create_platform_surface(SCREEN_WIDTH, 40, (180, 60, 200))
-        platform.rect = platform.image.get_rect()
-        platform.rect.x = 0
-        platform.rect.y = SCREEN_HEIGHT - 40
-        self.all_sprites.add(platform)
-        self.platforms.add(platform)
-        self.solid_platforms.add(platform)
-        
-        # Plataformas móviles rápidas
-        moving_platforms = [
-            (100, 550, 60, 8, (200, 80, 240), 1, 0, 250),
-            (500, 550, 60, 8, (200, 80, 240), 0, 1, 200),
-            (300, 450, 50, 8, (200, 80, 240), 1, 1, 180),
-            (700, 450, 50, 8, (200, 80, 240), 1, 0, 220),
-            (200, 350, 40, 8, (200, 80, 240), 0, 1, 190),
-            (600, 350, 40, 8, (200, 80, 240), 1, 1, 170),
-            (400, 250, 30, 8, (200, 80, 240), 1, 0, 210),
-            (800, 250, 30, 8, (200, 80, 240), 0, 1, 160),
-            (150, 150, 25, 8, (200, 80, 240), 1, 1, 140),
-            (650, 150, 25, 8, (200, 80, 240), 1, 0, 230)
-        ]
-        
-        for data in moving_platforms:
-            platform = MovingPlatform(*data)
-            platform.speed = 3  # Más rápido
-            self.all_sprites.add(platform)
-            self.platforms.add(platform)
-            self.solid_platforms.add(platform)
-        
-        # MUCHOS enemigos
-        enemy_positions = [
-            (100, 520, 'SHOOTER'), (300, 520, 'SHOOTER'), (500, 520, 'SHOOTER'), 
-            (700, 520, 'SHOOTER'), (900, 520, 'SHOOTER'), (200, 420, 'FLOATER'),
-            (400, 420, 'FLOATER'), (600, 420, 'FLOATER'), (800, 420, 'FLOATER'),
-            (150, 320, 'SHOOTER'), (350, 320, 'SHOOTER'), (550, 320, 'SHOOTER'),
-            (750, 320, 'SHOOTER'), (250, 220, 'FLOATER'), (450, 220, 'FLOATER'),
-            (650, 220, 'FLOATER'), (850, 220, 'FLOATER'), (100, 120, 'SHOOTER'),
-            (300, 120, 'SHOOTER'), (500, 120, 'SHOOTER'), (700, 120, 'SHOOTER'), (900, 120, 'SHOOTER')
-        ]
-        
-        for x, y, enemy_type in enemy_positions:
-            enemy = self.enemy_manager.spawn_enemy(x, y, enemy_type)
-            if enemy:
-                self.all_sprites.add(enemy)
-                self.position_enemy_on_platform(enemy)
-        
-        # Fragmentos por todos lados
-        fragment_positions = [
-            (80, 520), (280, 520), (480, 520), (680, 520), (880, 520),
-            (180, 420), (380, 420), (580, 420), (780, 420), (130, 320),
-            (330, 320), (530, 320), (730, 320), (230, 220), (430, 220),
-            (630, 220), (830, 220), (70, 120), (270, 120), (470, 120),
-            (670, 120), (870, 120), (450, 80), (250, 80), (650, 80)
-        ]
-        
-        for x, y in fragment_positions:
-            item = self.item_manager.spawn_item(x, y, 'FRAGMENT')  # ✅ CORREGIDO: 'FRAGMENT' -> 'FRAGMENT'
+                    continue
+                items.append(item)
+        if strict:
+            print(f"🔵 Fragmentos colocados en nivel {level.number}: {fragment_count}")
+        
+        # Power-ups (en modo estricto también se apoyan en plataformas)
+        for x, y, powerup_type in level.rows('powerups'):
+            item = self.create_item(x, y, powerup_type)
             if item:
-                self.position_item_on_platform(item)
+                if strict:
+                    self.position_item_on_platform(item, platforms)
+                items.append(item)
+        
+        if strict:
+            # ✅ VERIFICACIÓN FINAL
+            total_fragments = sum(1 for item in items if item.item_type == 'FRAGMENT')
+            print(f"🎯 NIVEL {level.number} VERIFICACIÓN: {len(enemies)} enemigos, {total_fragments} fragmentos, {len(items)} items totales")
+            
+            if total_fragments == 0 and level.rows('emergency_fragments'):
+                print(f"❌ ERROR: No hay fragmentos en el nivel {level.number}!")
+                # Crear fragmentos de emergencia
+                for x, y in level.rows('emergency_fragments'):
+                    item = self.create_item(x, y, 'FRAGMENT')
+                    if item:
+                        self.position_item_on_platform(item, platforms)
+                        items.append(item)
+                print("🆘 Fragmentos de emergencia creados")
+        
+        enemy_records = [(enemy.enemy_type, enemy.rect.x, enemy.rect.y, enemy.on_ground,
+                          getattr(enemy, 'wave_offset', 0.0)) for enemy in enemies]
+        item_records = [(item.item_type, *item.rect.center) for item in items]
+        return enemy_records, item_records
+
+    def create_item(self, x, y, item_type):
+        """Item suelto para colocarlo (None si el tipo no existe)"""
+        try:
+            return Item(x, y, item_type)
+        except KeyError:
+            return None
 
-    def position_enemy_on_platform(self, enemy):
+    def position_enemy_on_platform(self, enemy, platforms):
         """Posicionar enemigo sobre plataforma"""
-        for platform in self.platforms:
-            if (platform.rect.left <= enemy.rect.centerx <= platform.rect.right and
-                abs(enemy.rect.bottom - platform.rect.top) < 50):
-                enemy.rect.bottom = platform.rect.top
+        for platform in platforms:
+            if (platform.left <= enemy.rect.centerx <= platform.right and
+                abs(enemy.rect.bottom - platform.top) < 50):
+                enemy.rect.bottom = platform.top
                 enemy.on_ground = True
                 return True
         return False
 
-    def position_item_on_platform(self, item):
+    def position_item_on_platform(self, item, platforms):
         """Posicionar item sobre plataforma"""
-        for platform in self.platforms:
-            if (platform.rect.left <= item.rect.centerx <= platform.rect.right and
-                abs(item.rect.bottom - platform.rect.top) < 100):
-                item.rect.bottom = platform.rect.top - 10
+        for platform in platforms:
+            if (platform.left <= item.rect.centerx <= platform.right and
+                abs(item.rect.bottom - platform.top) < 100):
+                item.rect.bottom = platform.top - 10
                 return True
         return False
 
-    def create_stars(self):
+    def create_stars(self, level_number=0):
+        rng = self.rng.cosmetic_stream('estrellas', level_number)
         stars = []
         for _ in range(100):
             stars.append({
-                'x': random.randint(0, SCREEN_WIDTH),
-                'y': random.randint(0, SCREEN_HEIGHT), 
-                'speed': random.uniform(0.1, 0.5),
-                'size': random.randint(1, 3),
-                'brightness': random.randint(150, 255)
+                'x': rng.randint(0, SCREEN_WIDTH),
+                'y': rng.randint(0, SCREEN_HEIGHT), 
+                'speed': rng.uniform(0.1, 0.5),
+                'size': rng.randint(1, 3),
+                'brightness': rng.randint(150, 255)
             })
         return stars
 
-    def update_stars(self):
+    def update_stars(self, dt=1.0):
         for star in self.stars:
-            star['x'] -= star['speed']
+            star['x'] -= star['speed'] * dt
             if star['x'] < 0:
                 star['x'] = SCREEN_WIDTH
-                star['y'] = random.randint(0, SCREEN_HEIGHT)
+                star['y'] = self.rng.cosmetic.randint(0, SCREEN_HEIGHT)
 
     def draw_stars(self):
-        for star in self.stars:
-            color = (star['brightness'], star['brightness'], star['brightness'])
-            pygame.draw.circle(self.screen, color, (int(star['x']), int(star['y'])), star['size'])
-
-    def handle_platform_collisions(self):
-        """✅ SISTEMA MEJORADO DE COLISIONES CON PLATAFORMAS"""
-        # Colisión con plataformas sólidas
-        hits = pygame.sprite.spritecollide(self.player, self.solid_platforms, False)
-        if hits:
-            # Colisión desde arriba
-            if self.player.vel_y > 0:
-                self.player.rect.bottom = hits[0].rect.top
-                self.player.vel_y = 0
-                self.player.on_ground = True
-            # Colisión desde abajo  
-            elif self.player.vel_y < 0:
-                self.player.rect.top = hits[0].rect.bottom
-                self.player.vel_y = 0
-        
-        # Colisión con plataformas de un solo sentido
-        one_way_hits = pygame.sprite.spritecollide(self.player, self.one_way_platforms, False)
-        if one_way_hits:
-            # Solo colisiona si viene desde arriba
-            if self.player.vel_y > 0 and self.player.rect.bottom <= one_way_hits[0].rect.top + 10:
-                self.player.rect.bottom = one_way_hits[0].rect.top
-                self.player.vel_y = 0
-                self.player.on_ground = True
+        # Las estrellas quedan detrás de la geometría fija (ya está en el fondo):
+        # en el área de las que la tocan se quita la capa estática y se vuelve
+        # a mezclar encima después de dibujarlas
+        renderer = self.renderer
+        rects = [pygame.Rect(int(star['x']) - star['size'], int(star['y']) - star['size'],
+                             star['size'] * 2, star['size'] * 2) for star in self.stars]
+        areas = renderer.uncover_static(rects)
+        screen = self.screen
+        for star, rect in zip(self.stars, rects):
+            brightness = star['brightness']
+            renderer.mark(pygame.draw.circle(
+                screen, (brightness, brightness, brightness), rect.center, star['size']))
+        renderer.cover_static(areas)
 
     def handle_attack_collisions(self):
         """Manejar colisiones de ataques con enemigos"""
@@ -708,45 +509,29 @@ class Game:
             
         attack_hitbox = self.player.get_attack_hitbox()
         
-        for enemy in list(self.enemy_manager.enemies):
-            if attack_hitbox.colliderect(enemy.rect):
-                print(f"⚔️ ¡Enemigo golpeado! Tipo: {enemy.enemy_type}")
-                
-                # Destruir enemigo
-                enemy.kill()
-                self.play_sound(self.enemy_death_sound)
-                
-                # Recompensa
-                self.player.add_score(200)
-                
-                # Efectos visuales
-                self.create_enemy_death_particles(enemy.rect.centerx, enemy.rect.centery)
-                break
+        hits = self.enemy_manager.query(attack_hitbox)
+        if hits:
+            enemy = hits[0]
+            print(f"⚔️ ¡Enemigo golpeado! Tipo: {enemy.enemy_type}")
+            
+            # Destruir enemigo
+            enemy.kill()
+            self.play_sound(self.enemy_death_sound)
+            
+            # Recompensa
+            self.player.add_score(200)
+            
+            # Efectos visuales
+            self.create_enemy_death_particles(enemy.rect.centerx, enemy.rect.centery)
 
     def create_enemy_death_particles(self, x, y):
         """Crear partículas cuando un enemigo es destruido"""
-        for i in range(15):
-            self.player.attack_particles.append({
-                'x': x,
-                'y': y,
-                'vel_x': random.uniform(-3, 3),
-                'vel_y': random.uniform(-3, 3),
-                'color': (255, 100, 100),
-                'life': 30,
-                'size': random.randint(2, 6)
-            })
+        self.player.particles.emit(15, x, y, vel_x=(-3, 3), vel_y=(-3, 3),
+                                   color=(255, 100, 100), life=30, size=(2, 6))
 
     def handle_collisions(self):
-        # ✅ COLISIONES MEJORADAS CON PLATAFORMAS
-        self.handle_platform_collisions()
-        
-        # Colisiones enemigos con plataformas
-        for enemy in self.enemy_manager.enemies:
-            enemy_hits = pygame.sprite.spritecollide(enemy, self.platforms, False)
-            if enemy_hits and enemy.vel_y > 0:
-                enemy.rect.bottom = enemy_hits[0].rect.top
-                enemy.vel_y = 0
-                enemy.on_ground = True
+        # Las plataformas ya se resolvieron con barridos dentro de cada update
+        self.enemy_manager.refresh_index()
         
         # Colisiones con ataques
         self.handle_attack_collisions()
@@ -768,32 +553,59 @@ class Game:
                 if self.player.lives <= 0:
                     self.game_state = GAME_OVER
         
-        # ✅ VERIFICACIÓN DE VICTORIA - SIMPLIFICADA Y EFECTIVA
-        current_fragments = self.item_manager.get_fragment_count()
-        current_enemies = len(self.enemy_manager.enemies)
-        
-        print(f"🔍 Nivel {self.current_level}: {current_fragments} fragmentos, {current_enemies} enemigos")
-        
         # ✅ DEBUG TEMPORAL: Presiona P para forzar completado
-        if pygame.key.get_pressed()[pygame.K_p]:  # Presiona P para forzar completar nivel
+        if self.inputs.debug_complete and not self.level.endless:  # Presiona P para forzar completar nivel
             print("🔄 FORZANDO COMPLETADO DE NIVEL (DEBUG)")
             self.level_completed = True
             self.game_state = LEVEL_COMPLETE
-            return
-        
+            self.preload_next_level()
+
+    def on_level_progress(self, entity):
+        """Se llama al recoger un item o eliminar un enemigo: la victoria se
+        comprueba solo cuando cambian los contadores, no en cada frame"""
+        if self.level.endless:
+            return  # El modo infinito no tiene final
         # ✅ VERIFICACIÓN DIRECTA - Si no hay fragmentos y no hay enemigos
-        if current_fragments <= 0 and current_enemies <= 0:
+        if self.remaining_fragments() <= 0 and self.remaining_enemies() <= 0:
             if not self.level_completed and self.player.lives > 0:
                 print(f"🎉 ¡NIVEL {self.current_level} COMPLETADO!")
                 self.level_completed = True
                 self.game_state = LEVEL_COMPLETE
+                self.preload_next_level()
                 self.player.add_score(1000 + (self.current_level * 500))
                 if hasattr(self, 'level_complete_sound'):
                     self.play_sound(self.level_complete_sound)
 
+    def recover_player(self):
+        """Modo infinito: tras caer por un hueco (ya se restó la vida), volver
+        a la plataforma fija más cercana por detrás"""
+        player = self.player
+        area = pygame.Rect(player.rect.centerx - SCREEN_WIDTH, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        candidates = [platform for platform in self.platform_index.query(area)
+                      if platform in self.static_platforms]
+        if not candidates:
+            return
+        platform = max(candidates, key=lambda platform: platform.rect.left)
+        player.rect.midbottom = (platform.rect.centerx, platform.rect.top)
+        player.vel_x = player.vel_y = 0
+        player.on_ground = True
+        self.previous_positions.pop(player, None)  # Sin interpolar el salto
+
+    def remaining_fragments(self):
+        """Fragmentos por recoger en todo el nivel (también en trozos inactivos)"""
+        return self.item_manager.get_fragment_count() + self.stream.pending_fragments
+
+    def remaining_enemies(self):
+        return self.enemy_manager.get_enemy_count() + self.stream.pending_enemies
+
+    def preload_next_level(self):
+        """Preparar el siguiente nivel en segundo plano mientras se muestra LEVEL_COMPLETE"""
+        if self.current_level < LEVEL_COUNT:
+            self.level_loader.preload(self.current_level + 1)
+
     def next_level(self):
         """Pasar al siguiente nivel"""
-        if self.current_level < 6:  # ✅ Ahora hay 6 niveles
+        if self.current_level < LEVEL_COUNT:
             self.current_level += 1
             self.level_completed = False
             self.reset_game()
@@ -805,141 +617,268 @@ class Game:
             self.game_state = LEVEL_COMPLETE
 
     def draw_hud(self):
+        mark = self.renderer.mark
+        
         # Puntuación
-        font = pygame.font.Font(None, 36)
-        score_text = font.render(f'Puntos: {self.player.score}', True, TEXT_COLOR)
+        score_text = render_text(f'Puntos: {self.player.score}', 36, TEXT_COLOR)
         
-        hud_bg = pygame.Surface((200, 40), pygame.SRCALPHA)
-        hud_bg.fill((0, 0, 0, 128))
-        self.screen.blit(hud_bg, (SCREEN_WIDTH - 210, 10))
-        self.screen.blit(score_text, (SCREEN_WIDTH - 200, 20))
+        mark(self.screen.blit(self.hud_background, (SCREEN_WIDTH - 210, 10)))
+        mark(self.screen.blit(score_text, (SCREEN_WIDTH - 200, 20)))
         
-        # Nivel
-        level_text = font.render(f'Nivel: {self.current_level}/6', True, TEXT_COLOR)
-        self.screen.blit(level_text, (SCREEN_WIDTH - 210, 50))
+        # Nivel (o distancia recorrida en el modo infinito)
+        if self.level.endless:
+            level_text = render_text(f'Distancia: {self.player.rect.x // 50} m', 36, TEXT_COLOR)
+        else:
+            level_text = render_text(f'Nivel: {self.current_level}/{LEVEL_COUNT}', 36, TEXT_COLOR)
+        mark(self.screen.blit(level_text, (SCREEN_WIDTH - 210, 50)))
         
         # Vidas
-        lives_text = font.render(f'Vidas: {self.player.lives}', True, TEXT_COLOR)
-        self.screen.blit(lives_text, (20, 20))
+        lives_text = render_text(f'Vidas: {self.player.lives}', 36, TEXT_COLOR)
+        mark(self.screen.blit(lives_text, (20, 20)))
         
         # Fragmentos
-        fragment_count = self.item_manager.get_fragment_count()
-        fragment_text = font.render(f'Fragmentos: {fragment_count}', True, (100, 200, 255))
-        self.screen.blit(fragment_text, (20, 60))
+        fragment_count = self.remaining_fragments()
+        fragment_text = render_text(f'Fragmentos: {fragment_count}', 36, (100, 200, 255))
+        mark(self.screen.blit(fragment_text, (20, 60)))
         
         # Enemigos restantes
-        enemy_count = len(self.enemy_manager.enemies)
-        enemy_text = font.render(f'Enemigos: {enemy_count}', True, (255, 100, 100))
-        self.screen.blit(enemy_text, (20, 100))
-
-    def run(self):
-        running = True
-        while running:
-            self.clock.tick(FPS)
-            
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_r:
-                        self.reset_game()
-                        print("🔄 JUEGO REINICIADO")
-                    if event.key == pygame.K_n and self.game_state == LEVEL_COMPLETE:
-                        self.next_level()
-                    if event.key == pygame.K_x and self.player.attack_cooldown == 0:
-                        self.player.attack()
-                        self.play_sound(self.attack_sound)
-                    if event.key == pygame.K_m:
-                        # Control de música
-                        if pygame.mixer.music.get_busy():
-                            pygame.mixer.music.pause()
-                        else:
-                            pygame.mixer.music.unpause()
-
-            if self.game_state == PLAYING:
-                self.all_sprites.update()
-                self.item_manager.update()
-                self.enemy_manager.update(self.player)
-                self.handle_collisions()
-                self.update_stars()
-
-            # Dibujar
-            self.screen.fill(BACKGROUND_COLOR)
+        enemy_count = self.remaining_enemies()
+        enemy_text = render_text(f'Enemigos: {enemy_count}', 36, (255, 100, 100))
+        mark(self.screen.blit(enemy_text, (20, 100)))
+
+    def draw(self, alpha=1.0):
+        """Dibujar el frame actual a través del renderizador
+
+        ``alpha`` (0..1) es la fracción de tick transcurrida desde el último
+        paso de simulación; las entidades móviles se interpolan entre su
+        posición anterior y la actual.
+        """
+        renderer = self.renderer
+        mark = renderer.mark
+        section = self.profiler.section
+        
+        # La cámara sigue la posición interpolada del jugador
+        last = self.previous_positions.get(self.player)
+        player_x = self.player.rect.centerx
+        if last is not None:
+            player_x = last[0] + self.player.rect.width / 2 + (self.player.rect.x - last[0]) * alpha
+        camera = self.render_camera
+        renderer.set_camera(camera.follow(player_x))
+        view = camera.view
+        offset = (-camera.x, 0)
+        
+        with section('fondo'):
+            renderer.begin_frame()
+        with section('dibujo_estrellas'):
             self.draw_stars()
-            self.all_sprites.draw(self.screen)
-            self.item_manager.draw(self.screen)
-            self.enemy_manager.draw_projectiles(self.screen)
+        with section('dibujo_sprites'):
+            self.enemy_manager.sync_visible(self.previous_positions, view)
+            renderer.draw_group(self.all_sprites, self.previous_positions, alpha)
+            renderer.mark_all(self.item_manager.draw(self.screen, view))
+            renderer.mark_all(self.enemy_manager.draw_projectiles(self.screen, alpha, offset))
             
             # Dibujar hitbox de ataque (debug)
             if self.player.attacking:
-                attack_hitbox = self.player.get_attack_hitbox()
-                pygame.draw.rect(self.screen, (255, 0, 0), attack_hitbox, 2)
-            
+                attack_hitbox = camera.to_screen(self.player.get_attack_hitbox())
+                mark(pygame.draw.rect(self.screen, (255, 0, 0), attack_hitbox, 2))
+        
+        with section('dibujo_particulas'):
             # Partículas
-            self.player.update_particles()
             self.item_manager.update_particles(self.screen)
             
             # Dibujar partículas del jugador
-            for particle in self.player.jump_particles:
-                pygame.draw.circle(
-                    self.screen, 
-                    particle['color'],
-                    (int(particle['x']), int(particle['y'])),
-                    particle['size']
-                )
-
-            for particle in self.player.attack_particles:
-                pygame.draw.circle(
-                    self.screen,
-                    particle['color'],
-                    (int(particle['x']), int(particle['y'])),
-                    particle['size']
-                )
-            
+            renderer.mark_all(self.player.particles.draw(self.screen, offset))
+        
+        with section('hud'):
             # HUD
             self.draw_hud()
-            self.player.draw_health_bar(self.screen)
-            self.player.draw_powerup_indicators(self.screen)
+            mark(self.player.draw_health_bar(self.screen))
+            renderer.mark_all(self.player.draw_powerup_indicators(self.screen))
             
             # Controles en pantalla
-            font = pygame.font.Font(None, 24)
-            controls_text = font.render("CONTROLES: FLECHAS=MOVER, ESPACIO=SALTAR, X=ATACAR, M=MÚSICA, P=DEBUG", True, (200, 200, 255))
-            self.screen.blit(controls_text, (SCREEN_WIDTH//2 - 220, SCREEN_HEIGHT - 30))
-
-            # Estados especiales
-            if self.game_state == LEVEL_COMPLETE:
-                overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-                overlay.fill((0, 0, 0, 128))
-                self.screen.blit(overlay, (0, 0))
-                
-                font = pygame.font.Font(None, 72)
-                
-                if self.current_level < 6:
-                    text = font.render(f'NIVEL {self.current_level} COMPLETO!', True, (100, 255, 100))
-                    self.screen.blit(text, (SCREEN_WIDTH//2 - 250, SCREEN_HEIGHT//2 - 50))
-                    
-                    inst_font = pygame.font.Font(None, 36)
-                    inst_text = inst_font.render('Presiona N para siguiente nivel', True, TEXT_COLOR)
-                    self.screen.blit(inst_text, (SCREEN_WIDTH//2 - 180, SCREEN_HEIGHT//2 + 30))
-                else:
-                    text = font.render('¡JUEGO COMPLETADO!', True, (255, 215, 0))
-                    self.screen.blit(text, (SCREEN_WIDTH//2 - 220, SCREEN_HEIGHT//2 - 50))
-                    
-                    score_font = pygame.font.Font(None, 48)
-                    score_text = score_font.render(f'Puntuación Final: {self.player.score}', True, (255, 255, 255))
-                    self.screen.blit(score_text, (SCREEN_WIDTH//2 - 180, SCREEN_HEIGHT//2 + 50))
+            controls_text = render_text("CONTROLES: FLECHAS=MOVER, ESPACIO=SALTAR, X=ATACAR, M=MÚSICA, P=DEBUG", 24, (200, 200, 255))
+            mark(self.screen.blit(controls_text, (SCREEN_WIDTH//2 - 220, SCREEN_HEIGHT - 30)))
+
+        # Estados especiales
+        if self.game_state == LEVEL_COMPLETE:
+            mark(self.screen.blit(self.screen_overlay, (0, 0)))
+            
+            if self.current_level < LEVEL_COUNT:
+                text = render_text(f'NIVEL {self.current_level} COMPLETO!', 72, (100, 255, 100))
+                self.screen.blit(text, (SCREEN_WIDTH//2 - 250, SCREEN_HEIGHT//2 - 50))
                 
-            elif self.game_state == GAME_OVER:
-                overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-                overlay.fill((0, 0, 0, 128))
-                self.screen.blit(overlay, (0, 0))
+                inst_text = render_text('Presiona N para siguiente nivel', 36, TEXT_COLOR)
+                self.screen.blit(inst_text, (SCREEN_WIDTH//2 - 180, SCREEN_HEIGHT//2 + 30))
+            else:
+                text = render_text('¡JUEGO COMPLETADO!', 72, (255, 215, 0))
+                self.screen.blit(text, (SCREEN_WIDTH//2 - 220, SCREEN_HEIGHT//2 - 50))
                 
-                font = pygame.font.Font(None, 72)
-                text = font.render('GAME OVER', True, (255, 50, 50))
-                self.screen.blit(text, (SCREEN_WIDTH//2 - 180, SCREEN_HEIGHT//2 - 50))
+                score_text = render_text(f'Puntuación Final: {self.player.score}', 48, (255, 255, 255))
+                self.screen.blit(score_text, (SCREEN_WIDTH//2 - 180, SCREEN_HEIGHT//2 + 50))
+            
+        elif self.game_state == GAME_OVER:
+            mark(self.screen.blit(self.screen_overlay, (0, 0)))
+            
+            text = render_text('GAME OVER', 72, (255, 50, 50))
+            self.screen.blit(text, (SCREEN_WIDTH//2 - 180, SCREEN_HEIGHT//2 - 50))
 
-            pygame.display.flip()
+        # Panel del perfilador (F3)
+        mark(self.profiler.draw(self.screen))
 
-        pygame.quit()
+        with section('flip'):
+            renderer.present()
 
-        sys.exit()
+    def toggle_music(self):
+        """Pausar o reanudar la música de fondo"""
+        if pygame.mixer.music.get_busy():
+            pygame.mixer.music.pause()
+        else:
+            pygame.mixer.music.unpause()
+
+    def step(self, inputs=NO_INPUT):
+        """Avanzar la simulación un tick fijo con el estado de controles dado"""
+        self.inputs = inputs
+        dt = self.dt
+        
+        if inputs.restart:
+            self.reset_game()
+            print("🔄 JUEGO REINICIADO")
+        if inputs.next_level and self.game_state == LEVEL_COMPLETE:
+            self.next_level()
+        if inputs.attack and self.player.attack_cooldown == 0:
+            self.player.attack()
+            self.play_sound(self.attack_sound)
+        if inputs.toggle_music and not self.headless:
+            # Control de música
+            self.toggle_music()
+
+        # Posiciones antes del tick, para interpolar al dibujar y para los
+        # barridos de colisión contra plataformas móviles
+        # (las sombras en lote guardan la suya en FloaterBatch)
+        tracked = [self.player, *self.moving_platforms, *self.enemy_manager.individual_enemies]
+        self.previous_positions = {sprite: sprite.rect.topleft for sprite in tracked}
+        self.collider.previous = self.previous_positions
+
+        section = self.profiler.section
+        if self.game_state == PLAYING:
+            # Primero las plataformas móviles: el jugador y los enemigos se
+            # resuelven contra su posición en este tick
+            with section('plataformas'):
+                for platform in self.moving_platforms:
+                    platform.update(dt)
+                    self.platform_index.update(platform)
+            with section('jugador'):
+                self.player.update(inputs, dt)
+                if self.level.endless and self.player.rect.top > SCREEN_HEIGHT:
+                    self.recover_player()
+            with section('enemigos'):
+                for enemy in self.enemy_manager.individual_enemies:
+                    enemy.update(dt=dt)
+            with section('items'):
+                self.item_manager.update(self.player, dt)
+            with section('enemigos'):
+                self.enemy_manager.update(self.player, dt)
+            with section('colisiones'):
+                self.handle_collisions()
+            with section('estrellas'):
+                self.update_stars(dt)
+            with section('trozos'):
+                self.update_camera()
+        
+        with section('particulas'):
+            self.player.update_particles(dt)
+        
+        if self.recorder is not None:
+            self.recorder.write(inputs, self.state_checksum())
+
+    def state_checksum(self):
+        """CRC32 del estado de la simulación tras el tick
+        
+        Deja fuera lo cosmético (estrellas, partículas): dos partidas con la
+        misma semilla y los mismos controles dan la misma secuencia de valores.
+        """
+        player = self.player
+        values = [self.current_level, self.game_state, self.camera.x, *player.rect,
+                  player.pos_x, player.pos_y, player.vel_x, player.vel_y, player.on_ground, player.double_jump_available,
+                  player.attack_cooldown, player.hurt_timer, player.clock_ms,
+                  player.score, player.lives]
+        for powerup in player.powerups.values():
+            values += (powerup['active'], powerup['timer'])
+        for platform in self.moving_platforms:
+            values += (platform.pos_x, platform.pos_y)
+        for enemy in self.enemy_manager.individual_enemies:
+            values += (*enemy.rect, enemy.vel_x, enemy.vel_y, enemy.health)
+        for item in self.item_manager.items:
+            values += item.rect
+        crc = zlib.crc32(array.array('d', values))
+        crc = self.enemy_manager.floaters.checksum(crc)
+        return self.enemy_manager.projectiles.checksum(crc)
+
+    def segment_name(self):
+        """Nombre del tramo actual (nivel y estado) para el perfilado"""
+        level = 'infinito' if self.level.endless else f'nivel_{self.current_level}'
+        return f'{level}-{STATE_NAMES[self.game_state]}'
+
+    def simulate(self, inputs):
+        """Simular sin dibujar ni esperar al reloj: un tick por cada InputState"""
+        for state in inputs:
+            self.step(state)
+
+    def run(self, inputs=None):
+        """Bucle principal: simulación a paso fijo con dibujado interpolado
+
+        Con ``inputs`` (InputState por tick, p. ej. de una repetición) los
+        controles salen de ahí en lugar del teclado y el bucle termina al
+        agotarlos. Al terminar cierra pygame y vuelve (no sale del proceso).
+        """
+        running = True
+        replay = iter(inputs) if inputs is not None else None
+        tick_time = 1.0 / self.tick_rate
+        accumulator = 0.0
+        pressed = set()
+        profiler = self.profiler
+        capture = self.capture
+        while running:
+            with profiler.section('espera'):
+                frame_time = self.clock.tick(FPS) / 1000
+            profiler.end_frame()  # Un frame va de una espera del reloj a la siguiente
+            if capture is not None:
+                capture.begin_frame(self.segment_name())  # Sin contar la espera
+            accumulator += min(frame_time, MAX_FRAME_TIME)
+            
+            with profiler.section('eventos'):
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        running = False
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_F3:
+                            profiler.toggle()
+                        pressed.add(event.key)
+
+            while running and accumulator >= tick_time:
+                if replay is None:
+                    state = InputState.from_keyboard(pressed)
+                else:
+                    state = next(replay, None)
+                    if state is None:
+                        running = False
+                        break
+                self.step(state)
+                pressed = set()  # Cada pulsación se consume en un solo tick
+                accumulator -= tick_time
+            
+            self.draw(accumulator / tick_time)
+            if capture is not None:
+                capture.end_frame()
+
+        self.level.close()
+        self.level_loader.shutdown()
+        if self.recorder is not None:
+            self.recorder.close()
+            print(f"🎬 Partida grabada en {self.recorder.path} ({self.recorder.ticks} ticks)")
+        if self.frame_csv is not None and profiler.export_csv(self.frame_csv):
+            print(f"📊 Tiempos por frame guardados en {self.frame_csv}")
+        if capture is not None:
+            for path in capture.save():
+                print(f"🔬 Perfil guardado en {path}")
+        pygame.quit()
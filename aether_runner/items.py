@@ -2,6 +2,8 @@ import pygame
 import math
 import random
 from config import *
+from utils.sprite_loader import load_sprite
+from spatial_hash import SpatialHash
 
 class Item(pygame.sprite.Sprite):
     def __init__(self, x, y, item_type):
@@ -10,50 +12,92 @@ class Item(pygame.sprite.Sprite):
         self.config = ITEM_TYPES[item_type]
         
         # Crear superficie
-        self.image = pygame.Surface(self.config['size'], pygame.SRCALPHA)
-        self.create_sprite()
+        self.image = load_sprite(f'item/{item_type}', self.create_sprite)
         
         self.rect = self.image.get_rect()
+        self.manager = None  # ItemManager al que avisar al desaparecer
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        """Estado inicial centrado en (x, y); también al reciclarlo desde el pool"""
         self.rect.centerx = x
         self.rect.centery = y
         
         # Animación simple
         self.float_offset = 0
+        self.magnet_pos = None  # Centro en coma flotante mientras lo atrae el imán
 
     def create_sprite(self):
         """Crear sprite básico del item"""
         size = self.config['size']
         color = self.config['color']
+        surface = pygame.Surface(size, pygame.SRCALPHA)
         
         if self.item_type == 'FRAGMENT':
             # Cristal azul simple
-            pygame.draw.circle(self.image, color, (size[0]//2, size[1]//2), size[0]//2)
-            pygame.draw.circle(self.image, (255, 255, 255), (size[0]//2, size[1]//2), size[0]//4)
+            pygame.draw.circle(surface, color, (size[0]//2, size[1]//2), size[0]//2)
+            pygame.draw.circle(surface, (255, 255, 255), (size[0]//2, size[1]//2), size[0]//4)
         else:
             # Power-ups como círculos de colores
-            pygame.draw.circle(self.image, color, (size[0]//2, size[1]//2), size[0]//2)
+            pygame.draw.circle(surface, color, (size[0]//2, size[1]//2), size[0]//2)
+            
+        return surface
         
+    def kill(self):
+        was_alive = self.alive()
+        super().kill()
+        if was_alive and self.manager is not None:
+            self.manager.item_removed(self)
+
     def update(self):
         # Animación simple de flotación
         self.float_offset = math.sin(pygame.time.get_ticks() * 0.005) * 3
         self.rect.y += int(self.float_offset) - int(self.float_offset)
 
 class ItemManager:
-    def __init__(self):
+    def __init__(self, on_removed=None):
         self.items = pygame.sprite.Group()
+        self.by_type = {item_type: pygame.sprite.Group() for item_type in ITEM_TYPES}
+        self.index = SpatialHash()
+        self.index_dirty = False
+        self.on_removed = on_removed  # Callback al recoger/eliminar un item
+        self.pool = {item_type: [] for item_type in ITEM_TYPES}  # Items para reciclar
         
     def spawn_item(self, x, y, item_type='FRAGMENT'):
         """Crear item de forma robusta"""
         try:
-            item = Item(x, y, item_type)
+            free = self.pool[item_type]
+            if free:
+                item = free.pop()
+                item.reset(x, y)
+            else:
+                item = Item(x, y, item_type)
+            item.manager = self
             self.items.add(item)
+            self.by_type[item_type].add(item)
+            # El nivel puede recolocar el item tras crearlo: indexar más tarde
+            self.index_dirty = True
             return item
         except:
             return None
         
+    def refresh_index(self):
+        """Reconstruir el índice espacial si hubo items nuevos"""
+        if self.index_dirty:
+            self.index.clear()
+            for item in self.items:
+                self.index.insert(item)
+            self.index_dirty = False
+
     def check_collisions(self, player):
-        """Verificar colisiones de forma simple"""
-        hits = pygame.sprite.spritecollide(player, self.items, True)
+        """Verificar colisiones usando el índice espacial"""
+        self.refresh_index()
+        hits = []
+        for item in self.index.query(player.rect):
+            self.index.remove(item)
+            if item.alive():
+                item.kill()
+                hits.append(item)
         
         for item in hits:
             if item.item_type == 'FRAGMENT':
@@ -67,16 +111,68 @@ class ItemManager:
                 
         return len(hits)
     
+    def apply_magnet(self, player, dt=1.0):
+        """Acercar al jugador los fragmentos dentro del radio del imán
+
+        Solo se visitan los items de las celdas cercanas (consulta por radio en
+        el índice), así que el coste no crece con los fragmentos del nivel.
+        """
+        self.refresh_index()
+        target_x, target_y = player.rect.center
+        # Acercamiento exponencial independiente del paso de simulación
+        pull = 1 - (1 - MAGNET_EASING) ** dt
+        for item in self.index.query_radius(player.rect.center, MAGNET_RADIUS):
+            if item.item_type != 'FRAGMENT' or not item.alive():
+                continue
+            if item.magnet_pos is None:
+                item.magnet_pos = item.rect.center
+            x, y = item.magnet_pos
+            x += (target_x - x) * pull
+            y += (target_y - y) * pull
+            item.magnet_pos = (x, y)
+            item.rect.center = (round(x), round(y))
+            self.index.update(item)
+
     def update_particles(self, screen):
         """Partículas simples"""
         pass
     
-    def update(self):
+    def update(self, player=None, dt=1.0):
         self.items.update()
+        if player is not None and player.powerups['magnet']['active']:
+            self.apply_magnet(player, dt)
     
-    def draw(self, screen):
-        self.items.draw(screen)
+    def draw(self, screen, view=None):
+        """Dibujar los items (solo los que tocan ``view``, el área del mundo
+        visible) y devolver las áreas dibujadas"""
+        if view is None:
+            return screen.blits([(item.image, item.rect) for item in self.items])
+        self.refresh_index()
+        return screen.blits([(item.image, item.rect.move(-view.x, -view.y))
+                             for item in self.index.query(view) if item.alive()])
+
+    def despawn(self, item):
+        """Retirar un item sin contarlo como recogido (su trozo deja de estar
+        activo) y devolver su registro (tipo, centro_x, centro_y)"""
+        item.manager = None
+        item.kill()
+        self.recycle(item)
+        return (item.item_type, *item.rect.center)
+
+    def recycle(self, item):
+        """Guardar un item ya retirado o recogido para reutilizarlo en otro spawn"""
+        if item.alive():
+            return
+        self.index.remove(item)
+        self.pool[item.item_type].append(item)
         
-    def get_fragment_count(self):
+    def item_removed(self, item):
+        """Aviso de Item.kill (los grupos por tipo ya se actualizaron)"""
+        if self.on_removed is not None:
+            self.on_removed(item)
 
-        return sum(1 for item in self.items if item.item_type == 'FRAGMENT')
+    def count(self, item_type):
+        return len(self.by_type[item_type])
+
+    def get_fragment_count(self):
+        return self.count('FRAGMENT')
@@ -0,0 +1,198 @@
+"""Niveles descritos en disco (levels/level_N.json) y su precarga.
+
+Cada archivo guarda, en filas compactas, las plataformas fijas, móviles y de
+un solo sentido, los enemigos, los fragmentos y los power-ups de un nivel.
+``LevelLoader`` lee el archivo y deja preparado el nivel mediante la función
+``prepare`` que le pasa el juego: entidades ya colocadas sobre sus plataformas
+y todo repartido en trozos (``LevelChunk``) de CHUNK_WIDTH px de ancho, que se
+activan y retiran según avanza la cámara. Mientras se muestra LEVEL_COMPLETE, el siguiente nivel se
+prepara en un hilo de fondo para que el cambio de nivel sea inmediato.
+"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import *
+
+LEVEL_FORMAT = 1
+
+
+def level_path(number):
+    return os.path.join(LEVELS_DIR, f'level_{number}.json')
+
+
+def read_level(number):
+    """Leer y validar el archivo de un nivel"""
+    with open(level_path(number), 'r', encoding='utf-8') as level_file:
+        data = json.load(level_file)
+    if data.get('format') != LEVEL_FORMAT:
+        raise ValueError(f"Formato de nivel no soportado en {level_path(number)}")
+    for key in ('title', 'player'):
+        if key not in data:
+            raise ValueError(f"Falta '{key}' en {level_path(number)}")
+    return data
+
+
+class LevelChunk:
+    """Franja vertical de un nivel con el estado inicial de lo que contiene
+
+    Los registros son tuplas inmutables (así un reinicio parte siempre del
+    mismo estado): plataformas fijas (x, y, ancho, alto, color), móviles
+    (x, y, ancho, alto, color, mov_x, mov_y, distancia, velocidad), enemigos
+    (tipo, x, y, en_suelo, desfase_onda) e items (tipo, centro_x, centro_y).
+    Los sprites de la geometría fija y su capa se construyen al acercarse la
+    cámara y se liberan al retirar el trozo.
+    """
+
+    def __init__(self, index, left, right, solid_rows, one_way_rows, moving_rows, enemies, items):
+        self.index = index
+        self.left = left    # Extensión horizontal (incluye lo que sobresale de la franja)
+        self.right = right
+        self.solid_rows = solid_rows
+        self.one_way_rows = one_way_rows
+        self.moving_rows = moving_rows
+        self.enemies = enemies
+        self.items = items
+
+        # Geometría construida (None mientras no haga falta)
+        self.solid_platforms = None
+        self.one_way_platforms = None
+        self.layer = None  # Plataformas fijas compuestas, con origen en ``left``
+
+    @property
+    def built(self):
+        return self.solid_platforms is not None
+
+    def release(self):
+        self.solid_platforms = self.one_way_platforms = self.layer = None
+
+
+def build_chunks(width, solid_rows, one_way_rows, moving_rows, enemies, items):
+    """Repartir los registros de un nivel en trozos según su borde izquierdo"""
+    count = max(1, -(-width // CHUNK_WIDTH))
+    columns = [{'solid': [], 'one_way': [], 'moving': [], 'enemies': [], 'items': [],
+                'left': i * CHUNK_WIDTH, 'right': (i + 1) * CHUNK_WIDTH}
+               for i in range(count)]
+
+    def column(x, left, right):
+        entry = columns[max(0, min(int(x) // CHUNK_WIDTH, count - 1))]
+        entry['left'] = min(entry['left'], left)
+        entry['right'] = max(entry['right'], right)
+        return entry
+
+    for row in solid_rows:
+        column(row[0], row[0], row[0] + row[2])['solid'].append(row)
+    for row in one_way_rows:
+        column(row[0], row[0], row[0] + row[2])['one_way'].append(row)
+    for row in moving_rows:
+        x, _, platform_width, _, _, move_x, _, distance, speed = row
+        reach = (distance + 2 * speed) if move_x else 0  # Recorrido horizontal posible
+        column(x, x - reach, x + platform_width + reach)['moving'].append(row)
+    for record in enemies:
+        column(record[1], record[1], record[1])['enemies'].append(record)
+    for record in items:
+        column(record[1], record[1], record[1])['items'].append(record)
+
+    return [LevelChunk(i, entry['left'], entry['right'], tuple(entry['solid']),
+                       tuple(entry['one_way']), tuple(entry['moving']),
+                       tuple(entry['enemies']), tuple(entry['items']))
+            for i, entry in enumerate(columns)]
+
+
+class Level:
+    """Nivel listo para jugar: datos del archivo repartidos en trozos"""
+
+    def __init__(self, number, data):
+        self.number = number
+        self.data = data
+        self.title = data['title']
+        self.strict_placement = data.get('strict_placement', False)
+        self.width = max(data.get('width', SCREEN_WIDTH), SCREEN_WIDTH)
+        self.endless = False   # Sin condición de victoria (modo infinito)
+
+        # Los rellena la función ``prepare`` del juego
+        self.chunks = []       # LevelChunk de izquierda a derecha
+        self.first_chunk = 0   # Índice del primero que se conserva (el infinito descarta los de atrás)
+        self.left = 0          # Borde izquierdo del mundo (x del primer trozo conservado)
+        self.reach = (0, 0)    # Trozos vecinos que alcanza lo que sobresale (izq., der.)
+        self.stars = None      # Estrellas (x, y, velocidad, tamaño, brillo) iniciales
+
+    def rows(self, key):
+        return self.data.get(key, [])
+
+    def close(self):
+        """Liberar lo que el nivel tenga en marcha (nada en los de archivo)"""
+        pass
+
+    def set_chunks(self, chunks):
+        self.chunks = chunks
+        self.reach = (
+            max((-(-(chunk.index * CHUNK_WIDTH - chunk.left) // CHUNK_WIDTH) for chunk in chunks), default=0),
+            max((-(-(chunk.right - (chunk.index + 1) * CHUNK_WIDTH) // CHUNK_WIDTH) for chunk in chunks), default=0))
+
+    def chunk(self, index):
+        return self.chunks[index - self.first_chunk]
+
+    def chunk_index(self, x):
+        """Índice del trozo (conservado) al que pertenece la coordenada ``x``"""
+        last = self.first_chunk + len(self.chunks) - 1
+        return max(self.first_chunk, min(int(x) // CHUNK_WIDTH, last))
+
+    def evict_before(self, index):
+        """Descartar los trozos anteriores a ``index``: el mundo empieza en él"""
+        del self.chunks[:index - self.first_chunk]
+        self.first_chunk = index
+        self.left = index * CHUNK_WIDTH
+
+    def chunks_near(self, area):
+        """Trozos cuya extensión toca ``area`` (solo se revisan los candidatos)"""
+        reach_left, reach_right = self.reach
+        first = max(self.first_chunk, area.left // CHUNK_WIDTH - reach_right)
+        last = min(self.first_chunk + len(self.chunks) - 1,
+                   (area.right - 1) // CHUNK_WIDTH + reach_left)
+        return [chunk for chunk in self.chunks[first - self.first_chunk:last - self.first_chunk + 1]
+                if chunk.left < area.right and chunk.right > area.left]
+
+
+class LevelLoader:
+    """Caché de niveles preparados con precarga en segundo plano"""
+
+    def __init__(self, prepare):
+        self.prepare = prepare
+        self.levels = {}    # número -> Level
+        self.pending = {}   # número -> Future de una precarga
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def build(self, number):
+        level = Level(number, read_level(number))
+        self.prepare(level)
+        return level
+
+    def preload(self, number):
+        """Empezar a preparar un nivel en el hilo de fondo (si existe)"""
+        if not os.path.exists(level_path(number)):
+            return
+        with self.lock:
+            if number in self.levels or number in self.pending:
+                return
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='level-loader')
+            self.pending[number] = self.executor.submit(self.build, number)
+
+    def load(self, number):
+        """Obtener un nivel preparado (espera a su precarga o lo construye ya)"""
+        with self.lock:
+            level = self.levels.get(number)
+            future = self.pending.pop(number, None)
+        if level is None:
+            level = future.result() if future is not None else self.build(number)
+        with self.lock:
+            # Solo se conserva el nivel actual (para reinicios)
+            self.levels = {number: level}
+        return level
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -1,6 +1,58 @@
+import argparse
+import os
+import time
 from game import Game
+from replay import ReplayRecorder, run_replay
+from utils.rng import random_seed
+from utils.segment_profiler import SegmentProfiler
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Aether Runner")
+    parser.add_argument('--bake-atlas', action='store_true',
+                        help='hornear el atlas de sprites en assets/atlas y salir')
+    parser.add_argument('--endless', action='store_true',
+                        help='modo infinito con trozos generados proceduralmente')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='semilla de la partida y del modo infinito (aleatoria si se omite)')
+    parser.add_argument('--record', metavar='ARCHIVO', default=None,
+                        help='grabar los controles de cada tick en un archivo .aerp')
+    parser.add_argument('--replay', metavar='ARCHIVO', default=None,
+                        help='reproducir una partida grabada con --record')
+    parser.add_argument('--headless', action='store_true',
+                        help='con --replay: simular sin ventana lo más rápido posible')
+    parser.add_argument('--profile', metavar='CARPETA', default=None,
+                        help='perfilar con cProfile por nivel y estado (.pstats y pilas .collapsed)')
+    parser.add_argument('--profile-every', metavar='N', type=int, default=1,
+                        help='con --profile: perfilar solo uno de cada N frames')
+    parser.add_argument('--frame-csv', metavar='ARCHIVO', default=None,
+                        help='guardar al salir los tiempos por etapa de cada frame (F3 muestra el panel)')
+    return parser.parse_args()
 
 if __name__ == "__main__":
+    args = parse_args()
+
+    if args.bake_atlas:
+        # El horneado no necesita ventana visible
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        from utils.sprite_loader import bake_atlas
+        bake_atlas()
+        raise SystemExit(0)
+
+    capture = SegmentProfiler(args.profile, args.profile_every) if args.profile else None
+
+    if args.replay:
+        start = time.perf_counter()
+        game, divergence = run_replay(args.replay, headless=args.headless, capture=capture)
+        elapsed = time.perf_counter() - start
+        print(f"🎬 Repetición: nivel {game.current_level}, puntos {game.player.score}, "
+              f"vidas {game.player.lives}, posición {tuple(game.player.rect.topleft)} ({elapsed:.2f} s)")
+        if divergence is not None:
+            print(f"❌ La partida diverge de la grabación en el tick {divergence}")
+            raise SystemExit(1)
+        if args.headless:
+            print("✅ Checksums idénticos a la grabación")
+        raise SystemExit(0)
+
     print("=" * 50)
     print("AETHER RUNNER - INICIANDO")
     print("=" * 50)
@@ -10,6 +62,7 @@ if __name__ == "__main__":
     print("   S / ↓: Deslizarse")
     print("   R: Reiniciar nivel actual")
     print("   N: Siguiente nivel (modo debug)")
+    print("   F3: Panel de tiempos por frame")
     print("")
     print("OBJETIVO:")
     print("   • Recolecta todos los FRAGMENTOS AZULES")
@@ -28,7 +81,17 @@ if __name__ == "__main__":
     print("=" * 50)
     
     # Iniciar el juego
-    game = Game()
+    seed = args.seed
+    if seed is None and (args.endless or args.record):
+        seed = random_seed()
+    if args.endless:
+        print(f"♾️ MODO INFINITO - semilla {seed}")
+    game = Game(endless_seed=seed if args.endless else None, frame_csv=args.frame_csv, seed=seed)
+    if args.record:
+        level = 0 if args.endless else game.current_level
+        game.recorder = ReplayRecorder(args.record, level, game.seed, game.tick_rate)
+    game.capture = capture
 
     game.run()
+    raise SystemExit(0)
 
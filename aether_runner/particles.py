@@ -0,0 +1,87 @@
+import numpy as np
+import pygame
+from config import *
+
+class ParticleSystem:
+    """Sistema de partículas con capacidad fija y datos en arrays de NumPy
+
+    Cada atributo (posición, velocidad, vida, tamaño, color) vive en su propio
+    array; las partículas vivas ocupan siempre los primeros ``count`` huecos,
+    de modo que la actualización y la eliminación se hacen vectorizadas.
+    """
+
+    def __init__(self, capacity=PARTICLE_CAPACITY, rng=None):
+        self.capacity = capacity
+        self.count = 0
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vel_x = np.zeros(capacity, dtype=np.float32)
+        self.vel_y = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self._arrays = (self.x, self.y, self.vel_x, self.vel_y, self.life, self.size, self.color)
+
+    def emit(self, count, x, y, vel_x, vel_y, color, life, size):
+        """Emitir ``count`` partículas desde (x, y)
+
+        ``vel_x``, ``vel_y`` y ``size`` son rangos (mínimo, máximo) de los que
+        se toma un valor aleatorio por partícula. Si el sistema está lleno, las
+        partículas que no caben se descartan. Devuelve cuántas se emitieron.
+        """
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return 0
+
+        start, end = self.count, self.count + count
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.vel_x[start:end] = self.rng.uniform(vel_x[0], vel_x[1], count)
+        self.vel_y[start:end] = self.rng.uniform(vel_y[0], vel_y[1], count)
+        self.life[start:end] = life
+        self.size[start:end] = self.rng.integers(size[0], size[1], count, endpoint=True)
+        self.color[start:end] = color
+        self.count = end
+        return count
+
+    def update(self, dt=1.0):
+        """Mover todas las partículas y eliminar las que se apagaron"""
+        n = self.count
+        if n == 0:
+            return
+
+        self.x[:n] += self.vel_x[:n] * dt
+        self.y[:n] += self.vel_y[:n] * dt
+        self.life[:n] -= dt
+
+        alive = self.life[:n] > 0
+        if not alive.all():
+            # Compactar: las vivas pasan al principio de los arrays
+            keep = np.flatnonzero(alive)
+            for array in self._arrays:
+                array[:len(keep)] = array[keep]
+            self.count = len(keep)
+
+    def clear(self):
+        self.count = 0
+
+    def draw(self, screen, offset=(0, 0)):
+        """Dibujar las partículas vivas (desplazadas por ``offset``, la cámara)
+        y devolver las áreas dibujadas"""
+        n = self.count
+        if n == 0:
+            return []
+
+        draw_circle = pygame.draw.circle
+        offset_x, offset_y = offset
+        return [
+            draw_circle(screen, color, (x + offset_x, y + offset_y), size)
+            for x, y, size, color in zip(
+                self.x[:n].astype(np.int32).tolist(),
+                self.y[:n].astype(np.int32).tolist(),
+                self.size[:n].tolist(),
+                self.color[:n].tolist(),
+            )
+        ]
@@ -1,15 +1,36 @@
 import pygame
 import os
-import random
 import math
+from types import MappingProxyType
 from config import *
+from utils.sprite_loader import load_sprite
+from utils.text_cache import render_text
+from particles import ParticleSystem
+from controls import InputState
+from collision import LANDED
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, x, y):
+    # Colores del personaje
+    hair_color = (200, 220, 255)  # Plateado-azul
+    skin_color = (255, 220, 180)  # Piel anime
+    armor_color = (80, 100, 200)  # Azul armadura
+    cape_color = (60, 80, 180)    # Azul oscuro capa
+    energy_color = (100, 200, 255) # Azul energía
+
+    # Tintes precalculados: nombre -> (color, flags de mezcla)
+    # Con flags 0 el color se aplica como una capa semitransparente encima
+    FRAME_TINTS = {
+        'invincible': ((255, 255, 100, 128), pygame.BLEND_RGBA_MULT),
+        'hurt': ((255, 100, 100, 80), 0),
+    }
+
+    # Caché de frames compartida por todo el proceso (se crea una sola vez)
+    _frame_cache = None
+
+    def __init__(self, x, y, rng=None):
         super().__init__()
         
         # Sistema de animaciones anime
-        self.animations = {}
         self.load_anime_sprites()
         
         # Configuración de animación
@@ -24,7 +45,10 @@ class Player(pygame.sprite.Sprite):
         self.rect.x = x
         self.rect.y = y
         
-        # Física y movimiento
+        # Física y movimiento (``pos_x``/``pos_y`` guardan la posición con
+        # decimales; el Rect es su parte entera)
+        self.pos_x = float(x)
+        self.pos_y = float(y)
         self.vel_x = 0
         self.vel_y = 0
         self.acc_x = 0
@@ -36,6 +60,10 @@ class Player(pygame.sprite.Sprite):
         self.attacking = False
         self.attack_cooldown = 0
         self.hurt_timer = 0
+        self.clock_ms = 0  # Tiempo de simulación (ms) para power-ups y parpadeo
+        self.collider = None  # LevelCollider del nivel actual (lo asigna Game)
+        self.level_width = SCREEN_WIDTH  # Ancho del nivel (lo asigna Game)
+        self.level_left = 0  # Borde izquierdo del nivel (avanza en el modo infinito)
         
         # Stats
         self.lives = 3
@@ -52,8 +80,7 @@ class Player(pygame.sprite.Sprite):
         }
         
         # Efectos
-        self.jump_particles = []
-        self.attack_particles = []
+        self.particles = ParticleSystem(rng=rng)  # rng: generador de NumPy (cosmético)
         self.trail_particles = []
         self.trail_timer = 0
         
@@ -62,43 +89,61 @@ class Player(pygame.sprite.Sprite):
         self.normal_jump = PLAYER_JUMP
         
     def load_anime_sprites(self):
-        """Crear sprites estilo anime programáticamente"""
-        # Colores del personaje
-        self.hair_color = (200, 220, 255)  # Plateado-azul
-        self.skin_color = (255, 220, 180)  # Piel anime
-        self.armor_color = (80, 100, 200)  # Azul armadura
-        self.cape_color = (60, 80, 180)    # Azul oscuro capa
-        self.energy_color = (100, 200, 255) # Azul energía
-        
-        # Animación IDLE (4 frames)
-        self.animations['idle_right'] = [self.create_idle_sprite(i) for i in range(4)]
-        self.animations['idle_left'] = [pygame.transform.flip(sprite, True, False) 
-                                      for sprite in self.animations['idle_right']]
-        
-        # Animación RUN (6 frames)
-        self.animations['run_right'] = [self.create_run_sprite(i) for i in range(6)]
-        self.animations['run_left'] = [pygame.transform.flip(sprite, True, False) 
-                                     for sprite in self.animations['run_right']]
-        
-        # Animación JUMP (3 frames)
-        self.animations['jump_right'] = [self.create_jump_sprite(i) for i in range(3)]
-        self.animations['jump_left'] = [pygame.transform.flip(sprite, True, False) 
-                                      for sprite in self.animations['jump_right']]
-        
-        # Animación ATTACK (4 frames)
-        self.animations['attack_right'] = [self.create_attack_sprite(i) for i in range(4)]
-        self.animations['attack_left'] = [pygame.transform.flip(sprite, True, False) 
-                                        for sprite in self.animations['attack_right']]
-        
-        # Animación SLIDE (2 frames)
-        self.animations['slide_right'] = [self.create_slide_sprite(i) for i in range(2)]
-        self.animations['slide_left'] = [pygame.transform.flip(sprite, True, False) 
-                                       for sprite in self.animations['slide_right']]
-        
-        # Animación HURT (2 frames)
-        self.animations['hurt_right'] = [self.create_hurt_sprite(i) for i in range(2)]
-        self.animations['hurt_left'] = [pygame.transform.flip(sprite, True, False) 
-                                      for sprite in self.animations['hurt_right']]
+        """Obtener los sprites anime desde la caché compartida"""
+        if Player._frame_cache is None:
+            Player._frame_cache = self.build_frame_cache()
+        self.animations = Player._frame_cache
+
+    def build_frame_cache(self):
+        """Crear sprites estilo anime programáticamente (una vez por proceso)
+
+        Devuelve un mapeo inmutable 'animación_dirección' -> tupla de frames,
+        más la variante 'animación_dirección_invincible' para el parpadeo.
+        """
+        # Animación -> (constructor, número de frames, tintes por frame)
+        builders = {
+            'idle': (self.create_idle_sprite, 4, {}),
+            'run': (self.create_run_sprite, 6, {}),
+            'jump': (self.create_jump_sprite, 3, {}),
+            'attack': (self.create_attack_sprite, 4, {}),
+            'slide': (self.create_slide_sprite, 2, {}),
+            'hurt': (self.create_hurt_sprite, 2, {1: 'hurt'}),
+        }
+
+        def build(builder, frame, tint):
+            surface = builder(frame)
+            return self.tint_frame(surface, tint) if tint else surface
+
+        frames = {}
+        for name, (builder, count, tints) in builders.items():
+            right = [load_sprite(f'player/{name}_right/{i}',
+                                 lambda i=i: build(builder, i, tints.get(i)))
+                     for i in range(count)]
+            left = [load_sprite(f'player/{name}_left/{i}',
+                                lambda i=i: pygame.transform.flip(right[i], True, False))
+                    for i in range(count)]
+            
+            for direction, base in (('right', right), ('left', left)):
+                frames[f'{name}_{direction}'] = tuple(base)
+                frames[f'{name}_{direction}_invincible'] = tuple(
+                    load_sprite(f'player/{name}_{direction}/{i}/invincible',
+                                lambda i=i: self.tint_frame(base[i], 'invincible'))
+                    for i in range(count)
+                )
+
+        return MappingProxyType(frames)
+
+    def tint_frame(self, surface, tint):
+        """Crear una copia tintada de un frame según FRAME_TINTS"""
+        color, flags = self.FRAME_TINTS[tint]
+        tinted = surface.copy()
+        if flags:
+            tinted.fill(color, special_flags=flags)
+        else:
+            overlay = pygame.Surface(tinted.get_size(), pygame.SRCALPHA)
+            overlay.fill(color)
+            tinted.blit(overlay, (0, 0))
+        return tinted
 
     def create_idle_sprite(self, frame):
         """Crear sprite idle con animación sutil"""
@@ -376,17 +421,12 @@ class Player(pygame.sprite.Sprite):
             pygame.draw.line(surface, (100, 80, 80), (16, 14), (20, 14), 2)
             pygame.draw.line(surface, (100, 80, 80), (20, 14), (24, 14), 2)
         
-        # Efecto de daño (rojo)
-        if frame == 1:
-            hurt_surface = pygame.Surface((40, 60), pygame.SRCALPHA)
-            hurt_surface.fill((255, 100, 100, 80))
-            surface.blit(hurt_surface, (0, 0))
-        
+        # El efecto de daño (rojo) se aplica con el tinte 'hurt' al crear la caché
         return surface
 
     def update_powerups(self):
         """Actualizar temporizadores de power-ups activos"""
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock_ms
         
         for powerup_type, data in self.powerups.items():
             if data['active']:
@@ -400,7 +440,7 @@ class Player(pygame.sprite.Sprite):
             duration = self.powerups[powerup_type]['duration']
             
         self.powerups[powerup_type]['active'] = True
-        self.powerups[powerup_type]['timer'] = pygame.time.get_ticks()
+        self.powerups[powerup_type]['timer'] = self.clock_ms
         self.powerups[powerup_type]['duration'] = duration
         
         # Aplicar efectos inmediatos
@@ -432,60 +472,67 @@ class Player(pygame.sprite.Sprite):
         if not self.powerups[powerup_type]['active']:
             return 0
             
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock_ms
         time_passed = current_time - self.powerups[powerup_type]['timer']
         time_left = max(0, self.powerups[powerup_type]['duration'] - time_passed)
         return time_left / 1000  # Convertir a segundos
 
-    def update(self):
-        """Actualizar animación y estado"""
-        self.handle_movement()
-        self.apply_physics()
-        self.animate()
+    def update(self, inputs=None, dt=1.0):
+        """Actualizar animación y estado
+
+        ``inputs`` es el InputState del tick; si no se pasa, se lee el teclado.
+        ``dt`` es la duración del tick en ticks base (1.0 a 60 Hz).
+        """
+        if inputs is None:
+            inputs = InputState.from_keyboard()
+        self.clock_ms += 1000 / BASE_TICK_RATE * dt
+        
+        self.handle_movement(inputs)
+        self.apply_physics(dt)
+        self.animate(dt)
         self.update_powerups()
         self.update_attack()
-        self.update_particles()
+        self.update_particles(dt)
         
         # Cooldown de ataque
         if self.attack_cooldown > 0:
-            self.attack_cooldown -= 1
+            self.attack_cooldown = max(0, self.attack_cooldown - dt)
         
         # Timer de daño
         if self.hurt_timer > 0:
-            self.hurt_timer -= 1
+            self.hurt_timer = max(0, self.hurt_timer - dt)
 
-    def handle_movement(self):
+    def handle_movement(self, inputs):
         """Manejar entrada del jugador"""
         self.acc_x = 0
-        keys = pygame.key.get_pressed()
         
         moving = False
         
         # Movimiento izquierda/derecha
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        if inputs.left:
             self.acc_x = -PLAYER_ACCELERATION
             self.facing_right = False
             moving = True
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        if inputs.right:
             self.acc_x = PLAYER_ACCELERATION
             self.facing_right = True
             moving = True
             
         # Deslizarse
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+        if inputs.down:
             self.sliding = True
         else:
             self.sliding = False
             
         # Saltar
-        if (keys[pygame.K_SPACE] or keys[pygame.K_UP] or keys[pygame.K_w]):
+        if inputs.jump:
             self.jump()
             
         # Atacar
-        if keys[pygame.K_x] and self.attack_cooldown == 0:
+        if inputs.attack and self.attack_cooldown == 0:
             self.attack()
 
-    def animate(self):
+    def animate(self, dt=1.0):
         """Seleccionar y actualizar animación actual"""
         direction = 'right' if self.facing_right else 'left'
         
@@ -512,7 +559,7 @@ class Player(pygame.sprite.Sprite):
         animation_key = f"{self.current_animation}_{direction}"
         animation = self.animations[animation_key]
         
-        self.current_frame += self.animation_speed
+        self.current_frame += self.animation_speed * dt
         if self.current_frame >= len(animation):
             if self.current_animation == 'attack':
                 self.attacking = False
@@ -523,12 +570,10 @@ class Player(pygame.sprite.Sprite):
         
         self.image = animation[int(self.current_frame)]
         
-        # Efecto de invencibilidad (parpadeo)
+        # Efecto de invencibilidad (parpadeo con frames precalculados)
         if self.powerups['invincibility']['active']:
-            if pygame.time.get_ticks() % 200 < 100:
-                invincible_surface = self.image.copy()
-                invincible_surface.fill((255, 255, 100, 128), special_flags=pygame.BLEND_RGBA_MULT)
-                self.image = invincible_surface
+            if self.clock_ms % 200 < 100:
+                self.image = self.animations[f"{animation_key}_invincible"][int(self.current_frame)]
 
     def jump(self):
         """Manejar salto"""
@@ -560,72 +605,73 @@ class Player(pygame.sprite.Sprite):
 
     def create_jump_particles(self):
         """Crear partículas de salto"""
-        for i in range(8):
-            self.jump_particles.append({
-                'x': self.rect.centerx,
-                'y': self.rect.bottom,
-                'vel_x': random.uniform(-2, 2),
-                'vel_y': random.uniform(-4, -2),
-                'color': self.energy_color,
-                'life': 20,
-                'size': random.randint(2, 4)
-            })
+        self.particles.emit(8, self.rect.centerx, self.rect.bottom,
+                            vel_x=(-2, 2), vel_y=(-4, -2),
+                            color=self.energy_color, life=20, size=(2, 4))
 
     def create_attack_particles(self):
         """Crear partículas de ataque"""
         direction = 1 if self.facing_right else -1
-        for i in range(12):
-            self.attack_particles.append({
-                'x': self.rect.centerx + direction * 20,
-                'y': self.rect.centery,
-                'vel_x': direction * random.uniform(3, 6) + random.uniform(-1, 1),
-                'vel_y': random.uniform(-2, 2),
-                'color': self.energy_color,
-                'life': 15,
-                'size': random.randint(2, 5)
-            })
-
-    def update_particles(self):
+        vel_x = (2, 7) if self.facing_right else (-7, -2)
+        self.particles.emit(12, self.rect.centerx + direction * 20, self.rect.centery,
+                            vel_x=vel_x, vel_y=(-2, 2),
+                            color=self.energy_color, life=15, size=(2, 5))
+
+    def update_particles(self, dt=1.0):
         """Actualizar partículas (se dibujan en game.py)"""
-        # Partículas de salto
-        for particle in self.jump_particles[:]:
-            particle['life'] -= 1
-            if particle['life'] <= 0:
-                self.jump_particles.remove(particle)
-        
-        # Partículas de ataque
-        for particle in self.attack_particles[:]:
-            particle['x'] += particle['vel_x']
-            particle['y'] += particle['vel_y']
-            particle['life'] -= 1
-            if particle['life'] <= 0:
-                self.attack_particles.remove(particle)
-
-    def apply_physics(self):
+        self.particles.update(dt)
+
+    def apply_physics(self, dt=1.0):
         """Aplicar física al jugador"""
         # Aplicar fricción
         self.acc_x += self.vel_x * PLAYER_FRICTION
         
         # Actualizar velocidad
-        self.vel_x += self.acc_x
-        self.vel_y += PLAYER_GRAVITY
+        self.vel_x += self.acc_x * dt
+        self.vel_y += PLAYER_GRAVITY * dt
         
         # Limitar velocidad máxima
         speed_multiplier = 1.5 if self.powerups['speed_boost']['active'] else 1.0
         max_speed = self.normal_speed * speed_multiplier
         self.vel_x = max(-max_speed, min(self.vel_x, max_speed))
         
-        # Actualizar posición
-        self.rect.x += self.vel_x
-        self.rect.y += self.vel_y
-        
-        # Limitar al área de la pantalla
-        if self.rect.left < 0:
-            self.rect.left = 0
+        # Actualizar posición. Si otro sistema movió el Rect (colisiones,
+        # plataformas, respawn) la posición lo sigue sin perder los decimales
+        self.pos_x += self.rect.x - math.floor(self.pos_x)
+        self.pos_y += self.rect.y - math.floor(self.pos_y)
+        target_x = self.pos_x + self.vel_x * dt
+        target_y = self.pos_y + self.vel_y * dt
+        dx = math.floor(target_x) - self.rect.x
+        dy = math.floor(target_y) - self.rect.y
+        blocked_x = blocked_y = False
+        if self.collider is None:
+            self.rect.x += dx
+            self.rect.y += dy
+        else:
+            # Barrido por ejes contra las plataformas: sin túnel con dt grandes
+            blocked_x = self.collider.move_x(self.rect, dx)
+            if blocked_x:
+                self.vel_x = 0
+            snap = PLAYER_GROUND_SNAP if self.vel_y >= 0 else 0
+            contact = self.collider.move_y(self.rect, dy, snap)
+            blocked_y = contact is not None
+            if blocked_y:
+                self.vel_y = 0
+            self.on_ground = contact == LANDED
+        
+        # Limitar al ancho del nivel
+        if self.rect.left < self.level_left:
+            self.rect.left = self.level_left
             self.vel_x = 0
-        if self.rect.right > SCREEN_WIDTH:
-            self.rect.right = SCREEN_WIDTH
+            blocked_x = True
+        if self.rect.right > self.level_width:
+            self.rect.right = self.level_width
             self.vel_x = 0
+            blocked_x = True
+        
+        # Los decimales se conservan salvo en el eje en que algo detuvo al jugador
+        self.pos_x = float(self.rect.x) if blocked_x else target_x
+        self.pos_y = float(self.rect.y) if blocked_y else target_y
             
         # Resetear si cae fuera de la pantalla
         if self.rect.top > SCREEN_HEIGHT:
@@ -680,10 +726,11 @@ class Player(pygame.sprite.Sprite):
         pygame.draw.rect(surface, (0, 255, 0), (x, y, health_width, bar_height))
         
         # Borde
-        pygame.draw.rect(surface, (255, 255, 255), (x, y, bar_width, bar_height), 2)
+        return pygame.draw.rect(surface, (255, 255, 255), (x, y, bar_width, bar_height), 2)
 
     def draw_powerup_indicators(self, surface):
-        """Dibujar indicadores de power-ups activos"""
+        """Dibujar indicadores de power-ups activos y devolver las áreas dibujadas"""
+        rects = []
         x = 10
         y = 30
         icon_size = 20
@@ -698,9 +745,8 @@ class Player(pygame.sprite.Sprite):
         for i, (powerup_type, data) in enumerate(self.powerups.items()):
             if data['active']:
                 # Dibujar icono
-                font = pygame.font.Font(None, 24)
-                text = font.render(powerup_icons[powerup_type], True, (255, 255, 255))
-                surface.blit(text, (x, y + i * 25))
+                text = render_text(powerup_icons[powerup_type], 24, (255, 255, 255))
+                rects.append(surface.blit(text, (x, y + i * 25)))
                 
                 # Dibujar barra de tiempo
                 time_left = self.get_powerup_time_left(powerup_type)
@@ -709,8 +755,10 @@ class Player(pygame.sprite.Sprite):
                 bar_height = 5
                 time_width = (time_left / max_time) * bar_width
                 
-                pygame.draw.rect(surface, (100, 100, 100), (x + 25, y + 15 + i * 25, bar_width, bar_height))
+                rects.append(pygame.draw.rect(surface, (100, 100, 100), (x + 25, y + 15 + i * 25, bar_width, bar_height)))
                 pygame.draw.rect(surface, (255, 255, 0), (x + 25, y + 15 + i * 25, time_width, bar_height))
+        
+        return rects
 
     def get_attack_hitbox(self):
         """Obtener el área de ataque del jugador"""
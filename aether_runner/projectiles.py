@@ -0,0 +1,125 @@
+import zlib
+import numpy as np
+import pygame
+from config import *
+from utils.sprite_loader import load_sprite
+
+def create_projectile_sprite():
+    """Crear sprite del proyectil"""
+    surface = pygame.Surface((12, 12), pygame.SRCALPHA)
+    pygame.draw.circle(surface, (255, 50, 50), (6, 6), 6)
+    pygame.draw.circle(surface, (255, 150, 150), (6, 6), 3)
+    return surface
+
+class ProjectilePool:
+    """Proyectiles enemigos de todo el nivel en arrays de NumPy
+
+    Todos los tiradores disparan a este pool compartido, así que un proyectil
+    sigue vivo aunque muera el enemigo que lo lanzó. Los huecos están
+    reservados de antemano; los vivos ocupan siempre los primeros ``count``
+    y se mueven, envejecen, se descartan fuera de ``bounds`` y se prueban
+    contra el jugador con operaciones vectorizadas.
+    """
+
+    def __init__(self, capacity=PROJECTILE_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.image = load_sprite('projectile', create_projectile_sprite)
+        self.half_w = self.image.get_width() / 2
+        self.half_h = self.image.get_height() / 2
+        self.bounds = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+
+        # Posición del centro (actual y al inicio del tick, para interpolar)
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.prev_x = np.zeros(capacity, dtype=np.float32)
+        self.prev_y = np.zeros(capacity, dtype=np.float32)
+        self.vel_x = np.zeros(capacity, dtype=np.float32)
+        self.vel_y = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self._arrays = (self.x, self.y, self.prev_x, self.prev_y,
+                        self.vel_x, self.vel_y, self.life)
+
+    def __len__(self):
+        return self.count
+
+    def fire(self, x, y, dir_x, dir_y):
+        """Disparar desde (x, y) en la dirección (normalizada) dada
+
+        Si el pool está lleno el disparo se descarta. Devuelve True si se disparó.
+        """
+        if self.count >= self.capacity:
+            return False
+
+        i = self.count
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.vel_x[i] = dir_x * PROJECTILE_SPEED
+        self.vel_y[i] = dir_y * PROJECTILE_SPEED
+        self.life[i] = PROJECTILE_LIFETIME
+        self.count = i + 1
+        return True
+
+    def update(self, dt=1.0):
+        """Mover todos los proyectiles y descartar los caducados o fuera de la zona"""
+        n = self.count
+        if n == 0:
+            return
+
+        x, y = self.x[:n], self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        x += self.vel_x[:n] * dt
+        y += self.vel_y[:n] * dt
+        self.life[:n] -= dt
+
+        bounds = self.bounds
+        alive = ((self.life[:n] > 0) &
+                 (x + self.half_w >= bounds.left) & (x - self.half_w <= bounds.right) &
+                 (y + self.half_h >= bounds.top) & (y - self.half_h <= bounds.bottom))
+        self._keep(alive)
+
+    def collide_rect(self, rect, remove=True):
+        """Número de proyectiles que tocan ``rect`` (se eliminan si ``remove``)"""
+        n = self.count
+        if n == 0:
+            return 0
+
+        x, y = self.x[:n], self.y[:n]
+        hits = ((x - self.half_w < rect.right) & (x + self.half_w > rect.left) &
+                (y - self.half_h < rect.bottom) & (y + self.half_h > rect.top))
+        count = int(np.count_nonzero(hits))
+        if count and remove:
+            self._keep(~hits)
+        return count
+
+    def _keep(self, mask):
+        """Compactar: los proyectiles marcados pasan al principio de los arrays"""
+        if mask.all():
+            return
+        keep = np.flatnonzero(mask)
+        for array in self._arrays:
+            array[:len(keep)] = array[keep]
+        self.count = len(keep)
+
+    def clear(self):
+        self.count = 0
+
+    def checksum(self, crc=0):
+        """CRC32 del estado de los proyectiles vivos (continúa ``crc``)"""
+        for array in self._arrays:
+            crc = zlib.crc32(array[:self.count], crc)
+        return crc
+
+    def draw(self, screen, alpha=1.0, offset=(0, 0)):
+        """Dibujar los proyectiles interpolados (desplazados por ``offset``, la
+        cámara) y devolver las áreas dibujadas"""
+        n = self.count
+        if n == 0:
+            return []
+
+        x = self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha - self.half_w + offset[0]
+        y = self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha - self.half_h + offset[1]
+        image = self.image
+        return screen.blits([(image, position) for position in
+                             zip(x.astype(np.int32).tolist(), y.astype(np.int32).tolist())])
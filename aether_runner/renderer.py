@@ -0,0 +1,214 @@
+import pygame
+from config import *
+
+class FullRenderer:
+    """Renderizador clásico: limpia toda la pantalla y hace flip cada frame"""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.background = None
+        self.static_layers = None  # [(capa, x en el mundo)] de los trozos activos
+        self.static_shapes = {}  # capa -> rects (en la capa) de lo que tiene dibujado
+        self.camera_x = 0
+        self.view = screen.get_rect()  # Área del mundo visible
+
+    def begin_frame(self):
+        self.clear()
+
+    def clear(self, rect=None):
+        """Restaurar el fondo (color + capa estática) en toda la pantalla o en un área"""
+        if self.background is None:
+            self.screen.fill(BACKGROUND_COLOR, rect)
+        elif rect is None:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            self.screen.blit(self.background, rect, rect)
+
+    def set_static_layers(self, layers):
+        """Capas estáticas (alfa premultiplicado) de los trozos activos, como
+        pares (capa, x en el mundo)"""
+        layers = [(layer, x) for layer, x in layers if layer is not None]
+        if layers == self.static_layers:
+            self.invalidate()  # Mismas capas (reinicio): el fondo ya está compuesto
+            return
+        self.static_layers = layers
+        # Contorno de cada capa nueva: sus componentes no transparentes
+        self.static_shapes = {layer: self.static_shapes.get(layer) or
+                              pygame.mask.from_surface(layer, 0).get_bounding_rects()
+                              for layer, _ in layers}
+        self.compose_background()
+
+    def set_camera(self, x):
+        """Mover la vista: el fondo ya compuesto se desplaza y solo se
+        recompone la franja que entra en pantalla"""
+        x = int(x)
+        if x == self.camera_x:
+            return
+        shift = x - self.camera_x
+        self.camera_x = x
+        self.view.x = x
+        if self.background is not None:
+            self.compose_background(shift)
+
+    def compose_background(self, shift=0):
+        """Componer el fondo opaco de la vista: color de fondo + capas estáticas"""
+        if self.background is None:
+            background = pygame.Surface(self.screen.get_size())
+            if pygame.display.get_surface() is not None:
+                background = background.convert()
+            self.background = background
+            shift = 0
+        background = self.background
+        area = background.get_rect()
+        if shift and abs(shift) < area.width:
+            background.scroll(-shift, 0)
+            if shift > 0:
+                area = pygame.Rect(area.width - shift, 0, shift, area.height)
+            else:
+                area = pygame.Rect(0, 0, -shift, area.height)
+        
+        background.set_clip(area)
+        background.fill(BACKGROUND_COLOR)
+        for layer, x in self.static_layers or ():
+            background.blit(layer, (x - self.camera_x, 0), special_flags=pygame.BLEND_PREMULTIPLIED)
+        background.set_clip(None)
+        self.invalidate()
+
+    def uncover_static(self, rects):
+        """Dejar solo el color de fondo en ``rects`` (de pantalla) para dibujar
+        detrás de la geometría fija
+
+        Solo se tocan los que solapan la geometría de alguna capa. Devuelve
+        las áreas, sin solapes, que hay que pasar a ``cover_static`` al
+        terminar (una mezcla doble oscurecería las partes translúcidas).
+        """
+        if not self.static_layers:
+            return []
+        screen_rect = self.screen.get_rect()
+        touching = set()
+        for layer, x in self.static_layers:
+            left = x - self.camera_x
+            for shape in self.static_shapes[layer]:
+                shape = shape.move(left, 0)
+                if shape.colliderect(screen_rect):
+                    touching.update(shape.collidelistall(rects))
+        areas = []
+        for index in sorted(touching):
+            rect = screen_rect.clip(rects[index])  # fill() desplaza (no recorta) los rect con x < 0
+            if not rect:
+                continue
+            overlap = rect.collidelist(areas)
+            while overlap != -1:
+                rect.union_ip(areas.pop(overlap))
+                overlap = rect.collidelist(areas)
+            areas.append(rect)
+        for area in areas:
+            self.screen.fill(BACKGROUND_COLOR, area)
+        return areas
+
+    def cover_static(self, rects):
+        """Volver a mezclar las capas estáticas sobre ``rects`` (de pantalla,
+        sin solapes): lo dibujado ahí queda detrás de la geometría fija"""
+        screen = self.screen
+        for layer, x in self.static_layers or ():
+            left = x - self.camera_x
+            span = layer.get_rect(x=left)
+            blits = []
+            for i in span.collidelistall(rects):
+                clip = rects[i].clip(span)
+                blits.append((layer, clip, clip.move(-left, 0), pygame.BLEND_PREMULTIPLIED))
+            if blits:
+                screen.blits(blits, doreturn=False)
+
+    def mark(self, rect):
+        """Registrar un área dibujada (no hace falta en modo completo)"""
+        return rect
+
+    def mark_all(self, rects):
+        return rects
+
+    def draw_group(self, group, previous=None, alpha=1.0):
+        """Dibujar un grupo de sprites y registrar sus áreas
+
+        Si se pasan las posiciones del tick anterior (``previous``), cada sprite
+        se dibuja interpolado: anterior + (actual - anterior) * alpha. Los
+        sprites fuera de la vista no se dibujan.
+        """
+        camera_x = self.camera_x
+        visible = self.view.inflate(2 * INTERPOLATION_SNAP, 2 * INTERPOLATION_SNAP)
+        if not previous or alpha >= 1.0:
+            return self.mark_all(self.screen.blits(
+                [(sprite.image, sprite.rect.move(-camera_x, 0)) for sprite in group
+                 if visible.colliderect(sprite.rect)]))
+        
+        blits = []
+        for sprite in group:
+            if not visible.colliderect(sprite.rect):
+                continue
+            x, y = sprite.rect.topleft
+            last = previous.get(sprite)
+            if last is not None and abs(x - last[0]) + abs(y - last[1]) <= INTERPOLATION_SNAP:
+                x = round(last[0] + (x - last[0]) * alpha)
+                y = round(last[1] + (y - last[1]) * alpha)
+            blits.append((sprite.image, (x - camera_x, y)))
+        return self.mark_all(self.screen.blits(blits))
+
+    def invalidate(self):
+        """Forzar un redibujado completo en el próximo frame"""
+        pass
+
+    def present(self):
+        pygame.display.flip()
+
+class DirtyRectRenderer(FullRenderer):
+    """Renderizador por rectángulos sucios
+
+    Solo se limpian las áreas dibujadas en el frame anterior y solo se envían
+    a la pantalla las áreas que cambiaron. Si el área sucia supera el umbral
+    se hace un flip completo, que resulta más barato.
+    """
+
+    def __init__(self, screen, threshold=DIRTY_RECT_THRESHOLD):
+        super().__init__(screen)
+        self.threshold_area = threshold * screen.get_width() * screen.get_height()
+        self.previous_rects = []
+        self.current_rects = []
+        self.full_redraw = True
+
+    def begin_frame(self):
+        if self.full_redraw:
+            self.clear()
+        else:
+            for rect in self.previous_rects:
+                self.clear(rect)
+        self.current_rects = []
+
+    def mark(self, rect):
+        if rect:
+            self.current_rects.append(rect)
+        return rect
+
+    def mark_all(self, rects):
+        self.current_rects.extend(rect for rect in rects if rect)
+        return rects
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def present(self):
+        dirty = self.previous_rects + self.current_rects
+        dirty_area = sum(rect.width * rect.height for rect in dirty)
+
+        if self.full_redraw or dirty_area > self.threshold_area:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+
+        self.previous_rects = self.current_rects
+        self.full_redraw = False
+
+def create_renderer(screen, mode=RENDER_MODE):
+    """Crear el renderizador configurado ('full' o 'dirty')"""
+    if mode == 'dirty':
+        return DirtyRectRenderer(screen)
+    return FullRenderer(screen)
@@ -0,0 +1,152 @@
+"""Grabación y reproducción de partidas (formato binario .aerp).
+
+Como el juego solo recibe un ``InputState`` por tick, una partida queda
+descrita por su cabecera (nivel inicial, semilla y ticks por segundo) y la
+secuencia de controles. Cada ``InputState`` se empaqueta en un entero de 16
+bits (un bit por campo, en el orden de ``InputState._fields``). Desde la
+versión 2 cada tick guarda además el CRC32 del estado al terminarlo
+(``Game.state_checksum``): al reproducir sin ventana se comprueba tick a tick
+y se sabe en qué tick exacto diverge la partida.
+
+Cabecera (little endian): magia ``AERP``, versión (u8), nivel inicial (u8,
+0 = modo infinito), ticks por segundo (u16), semilla (i64) y número de ticks
+(u32, se completa al cerrar; si la grabación se cortó se deduce del tamaño).
+Después, por tick: controles (u16) y checksum (u32).
+"""
+import struct
+from controls import InputState
+
+REPLAY_MAGIC = b'AERP'
+REPLAY_VERSION = 2
+_HEADER = struct.Struct('<4sBBHqI')
+_TICK = struct.Struct('<HI')
+_FIELDS = InputState._fields
+
+
+def pack_input(state):
+    bits = 0
+    for i, value in enumerate(state):
+        if value:
+            bits |= 1 << i
+    return bits
+
+
+def unpack_input(bits):
+    return InputState(*(bool(bits >> i & 1) for i in range(len(_FIELDS))))
+
+
+class ReplayRecorder:
+    """Escribe una partida tick a tick"""
+
+    def __init__(self, path, level, seed, tick_rate):
+        self.path = path
+        self.header = (level, tick_rate, seed)
+        self.ticks = 0
+        self.buffer = bytearray()
+        self.file = open(path, 'wb')
+        self.file.write(_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, level, tick_rate, seed, 0))
+
+    def write(self, state, checksum):
+        self.buffer += _TICK.pack(pack_input(state), checksum)
+        self.ticks += 1
+        if len(self.buffer) >= 4096 * _TICK.size:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        if self.file is None:
+            return
+        self.flush()
+        level, tick_rate, seed = self.header
+        self.file.seek(0)
+        self.file.write(_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, level, tick_rate, seed, self.ticks))
+        self.file.close()
+        self.file = None
+
+
+class Replay:
+    """Partida grabada: cabecera más los controles (y checksums) de cada tick"""
+
+    def __init__(self, level, seed, tick_rate, inputs, checksums):
+        self.level = level
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.inputs = inputs  # Lista de InputState
+        self.checksums = checksums  # CRC32 del estado tras cada tick
+
+    @property
+    def endless(self):
+        return self.level == 0
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as replay_file:
+            data = replay_file.read()
+        if len(data) < _HEADER.size:
+            raise ValueError(f"Archivo de repetición demasiado corto: {path}")
+        magic, version, level, tick_rate, seed, ticks = _HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"Formato de repetición no soportado: {path}")
+
+        body = data[_HEADER.size:]
+        body = body[:len(body) - len(body) % _TICK.size]
+        if ticks:
+            body = body[:ticks * _TICK.size]
+        # Los mismos valores se repiten mucho: un InputState por valor distinto
+        states = {}
+        inputs = []
+        checksums = []
+        for bits, checksum in _TICK.iter_unpack(body):
+            state = states.get(bits)
+            if state is None:
+                state = states[bits] = unpack_input(bits)
+            inputs.append(state)
+            checksums.append(checksum)
+        return cls(level, seed, tick_rate, inputs, checksums)
+
+
+def replay_game(replay, headless=True):
+    """Crear un juego en el estado inicial de una partida grabada"""
+    from game import Game
+    return Game(headless=headless, tick_rate=replay.tick_rate, seed=replay.seed,
+                start_level=max(1, replay.level),
+                endless_seed=replay.seed if replay.endless else None)
+
+
+def verify_replay(game, replay, capture=None):
+    """Simular la partida comprobando el checksum de cada tick
+
+    Con ``capture`` (SegmentProfiler) cada tick cuenta como un frame del
+    perfil. Devuelve el primer tick que no coincide, o None si coinciden todos.
+    """
+    divergence = None
+    for tick, (state, expected) in enumerate(zip(replay.inputs, replay.checksums)):
+        if capture is not None:
+            capture.begin_frame(game.segment_name())
+        game.step(state)
+        if capture is not None:
+            capture.end_frame()
+        if divergence is None and game.state_checksum() != expected:
+            divergence = tick
+    return divergence
+
+
+def run_replay(path, headless=True, capture=None):
+    """Reproducir una partida: sin ventana se simula de golpe (comprobando
+    los checksums); con ventana se reproduce al ritmo normal con el bucle
+    del juego. En los dos casos se perfila con ``capture`` si se da.
+    Devuelve el juego y el primer tick que diverge (o None)"""
+    replay = Replay.load(path)
+    game = replay_game(replay, headless)
+    if headless:
+        divergence = verify_replay(game, replay, capture)
+        if capture is not None:
+            for profile_path in capture.save():
+                print(f"🔬 Perfil guardado en {profile_path}")
+        return game, divergence
+    game.capture = capture
+    game.run(replay.inputs)
+    return game, None
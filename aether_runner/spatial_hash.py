@@ -0,0 +1,122 @@
+from config import *
+
+class SpatialHash:
+    """Índice espacial de rejilla uniforme para consultas de colisión
+
+    Cada objeto (con atributo ``rect``) se registra en las celdas que cubre.
+    Una consulta solo revisa los objetos de las celdas que toca el área, así
+    que el coste depende de la densidad local y no del tamaño del nivel.
+    Los resultados se devuelven en orden de inserción para que las
+    colisiones sean deterministas.
+    """
+
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}    # (cx, cy) -> {objeto: orden}
+        self.entries = {}  # objeto -> (rango de celdas, orden)
+        self._next_order = 0
+        self.version = 0   # Cambia al insertar o quitar objetos (no al moverlos)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, obj):
+        return obj in self.entries
+
+    def __iter__(self):
+        return iter(list(self.entries))
+
+    def cell_range(self, rect):
+        """Celdas (x0, y0, x1, y1) que cubre un rectángulo"""
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def insert(self, obj):
+        if obj in self.entries:
+            self.update(obj)
+            return
+        cells = self.cell_range(obj.rect)
+        order = self._next_order
+        self._next_order += 1
+        self.version += 1
+        self.entries[obj] = (cells, order)
+        self._add_to_cells(obj, cells, order)
+
+    def remove(self, obj):
+        entry = self.entries.pop(obj, None)
+        if entry is not None:
+            self.version += 1
+            self._remove_from_cells(obj, entry[0])
+
+    def update(self, obj):
+        """Reubicar un objeto que se movió (solo si cambió de celdas)"""
+        entry = self.entries.get(obj)
+        if entry is None:
+            self.insert(obj)
+            return
+        cells, order = entry
+        new_cells = self.cell_range(obj.rect)
+        if new_cells != cells:
+            self._remove_from_cells(obj, cells)
+            self._add_to_cells(obj, new_cells, order)
+            self.entries[obj] = (new_cells, order)
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self.version += 1
+
+    def query(self, rect):
+        """Objetos cuyo rect colisiona con ``rect``, en orden de inserción"""
+        x0, y0, x1, y1 = self.cell_range(rect)
+        found = {}
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        hits = [obj for obj in found if obj.rect.colliderect(rect)]
+        if len(hits) > 1:
+            hits.sort(key=found.__getitem__)
+        return hits
+
+    def query_radius(self, center, radius):
+        """Objetos cuyo centro está a ``radius`` o menos de ``center``, en orden de inserción"""
+        cx, cy = center
+        size = self.cell_size
+        x0, y0 = int(cx - radius) // size, int(cy - radius) // size
+        x1, y1 = int(cx + radius) // size, int(cy + radius) // size
+        found = {}
+        cells = self.cells
+        for gx in range(x0, x1 + 1):
+            for gy in range(y0, y1 + 1):
+                bucket = cells.get((gx, gy))
+                if bucket:
+                    found.update(bucket)
+        limit = radius * radius
+        hits = []
+        for obj in found:
+            ox, oy = obj.rect.center
+            if (ox - cx) ** 2 + (oy - cy) ** 2 <= limit:
+                hits.append(obj)
+        if len(hits) > 1:
+            hits.sort(key=found.__getitem__)
+        return hits
+
+    def _add_to_cells(self, obj, cells, order):
+        x0, y0, x1, y1 = cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.cells.setdefault((cx, cy), {})[obj] = order
+
+    def _remove_from_cells(self, obj, cells):
+        x0, y0, x1, y1 = cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.pop(obj, None)
+                    if not bucket:
+                        del self.cells[(cx, cy)]
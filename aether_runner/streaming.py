@@ -0,0 +1,173 @@
+from config import *
+
+class LevelStream:
+    """Activación y retirada de los trozos de un nivel según la cámara
+
+    Solo los trozos cercanos a la vista tienen sus plataformas en los grupos
+    y en el índice espacial y sus entidades vivas, así que la memoria y el
+    coste por tick no dependen de la longitud del nivel. Al retirar un trozo
+    se guarda el estado de lo que sobrevive en él para recrearlo si la cámara
+    vuelve; sus fragmentos y enemigos siguen contando para la victoria. Cada
+    entidad pertenece al trozo en el que está en ese momento (una sombra que
+    se desplazó o un fragmento atraído por el imán cambian de trozo), no al
+    que la creó. Los enemigos e items retirados o eliminados vuelven al pool
+    de su gestor.
+
+    En el modo infinito los trozos llegan después de crear el flujo: los
+    que no tienen estado guardado parten de sus registros iniciales. Los que
+    quedan más de ENDLESS_CHUNKS_BEHIND trozos por detrás se descartan con su
+    estado guardado, así que la memoria no crece con la distancia recorrida.
+    """
+
+    def __init__(self, game, level):
+        self.game = game
+        self.level = level
+        self.active = {}  # índice del trozo -> entidades y plataformas creadas
+        # Estado guardado de los trozos inactivos: índice -> (enemigos, items)
+        self.saved = {chunk.index: (chunk.enemies, chunk.items) for chunk in level.chunks}
+        self.pending_enemies = sum(len(chunk.enemies) for chunk in level.chunks)
+        self.pending_fragments = sum(1 for chunk in level.chunks
+                                     for record in chunk.items if record[0] == 'FRAGMENT')
+
+    def update(self, view):
+        """Activar los trozos que se acercan a la vista y retirar los lejanos
+
+        Devuelve True si cambió el conjunto de trozos activos.
+        """
+        changed = False
+        near = view.inflate(2 * CHUNK_ACTIVATE_MARGIN, 0)
+        for chunk in self.level.chunks_near(near):
+            if chunk.index not in self.active:
+                self.activate(chunk)
+                changed = True
+
+        far = view.inflate(2 * CHUNK_RETIRE_MARGIN, 0)
+        retiring = [chunk for chunk in map(self.level.chunk, self.active)
+                    if chunk.right <= far.left or chunk.left >= far.right]
+        if retiring:
+            self.rehome()
+            for chunk in retiring:
+                self.retire(chunk)
+            if self.level.endless:
+                self.evict()
+            changed = True
+        return changed
+
+    def rehome(self):
+        """Pasar cada entidad viva al trozo en el que está ahora"""
+        game = self.game
+        strays = []
+        for index, (_, enemies, items) in self.active.items():
+            for entities in (enemies, items):
+                keep = []
+                for entity in entities:
+                    home = index
+                    if entity is not None and entity.alive():
+                        if getattr(entity, 'batch', None) is not None:
+                            entity.batch.sync(entity)
+                        home = self.level.chunk_index(entity.rect.centerx)
+                    if home == index:
+                        keep.append(entity)
+                    else:
+                        strays.append((home, entities is enemies, entity))
+                entities[:] = keep
+
+        for home, is_enemy, entity in strays:
+            if home in self.active:
+                self.active[home][1 if is_enemy else 2].append(entity)
+            elif is_enemy:
+                self.save(home, (game.enemy_manager.despawn(entity),), ())
+            else:
+                self.save(home, (), (game.item_manager.despawn(entity),))
+
+    def save(self, index, enemy_records, item_records):
+        """Añadir registros al estado guardado de un trozo inactivo"""
+        saved = self.saved.get(index)
+        if saved is None:
+            # Trozo del modo infinito que aún no se activó: parte de sus registros
+            chunk = self.level.chunk(index)
+            saved = (chunk.enemies, chunk.items)
+            self.count(*saved, 1)
+        self.saved[index] = (saved[0] + enemy_records, saved[1] + item_records)
+        self.count(enemy_records, item_records, 1)
+
+    def count(self, enemy_records, item_records, sign):
+        """Sumar (o restar) registros a los enemigos y fragmentos pendientes"""
+        self.pending_enemies += sign * len(enemy_records)
+        self.pending_fragments += sign * sum(1 for record in item_records if record[0] == 'FRAGMENT')
+
+    def evict(self):
+        """Modo infinito: descartar los trozos muy alejados por detrás"""
+        level = self.level
+        horizon = min(self.active, default=level.first_chunk) - ENDLESS_CHUNKS_BEHIND
+        if horizon <= level.first_chunk:
+            return
+        for index in range(level.first_chunk, horizon):
+            saved = self.saved.pop(index, None)
+            if saved is not None:
+                self.count(*saved, -1)
+        level.evict_before(horizon)
+
+    def activate(self, chunk):
+        game = self.game
+        if not chunk.built:
+            game.build_chunk(chunk)
+
+        platforms = []
+        for platform in chunk.solid_platforms + chunk.one_way_platforms:
+            platform.kill()  # Sigue en los grupos de un intento anterior del nivel
+        for platform in chunk.solid_platforms:
+            game.solid_platforms.add(platform)
+            platforms.append(platform)
+        for platform in chunk.one_way_platforms:
+            game.one_way_platforms.add(platform)
+            platforms.append(platform)
+        for platform in platforms:
+            game.static_platforms.add(platform)
+        for row in chunk.moving_rows:
+            platform = game.create_moving_platform(*row)
+            game.all_sprites.add(platform)
+            game.solid_platforms.add(platform)
+            platforms.append(platform)
+        for platform in platforms:
+            game.platforms.add(platform)
+            game.platform_index.insert(platform)
+
+        saved = self.saved.pop(chunk.index, None)
+        enemy_records, item_records = saved if saved is not None else (chunk.enemies, chunk.items)
+        enemies = [game.spawn_enemy_record(record) for record in enemy_records]
+        items = [game.item_manager.spawn_item(x, y, item_type) for item_type, x, y in item_records]
+        if saved is not None:
+            self.count(enemy_records, item_records, -1)
+        self.active[chunk.index] = (platforms, enemies, items)
+
+    def retire(self, chunk):
+        game = self.game
+        platforms, enemies, items = self.active.pop(chunk.index)
+        for platform in platforms:
+            platform.kill()
+            game.platform_index.remove(platform)
+
+        # Lo que sigue vivo se guarda tal como está (sin contarlo como eliminado)
+        enemy_records, item_records = [], []
+        for enemy in enemies:
+            if enemy.alive():
+                enemy_records.append(game.enemy_manager.despawn(enemy))
+            else:
+                game.enemy_manager.recycle(enemy)
+        for item in items:
+            if item is None:
+                continue
+            if item.alive():
+                item_records.append(game.item_manager.despawn(item))
+            else:
+                game.item_manager.recycle(item)
+        enemy_records, item_records = tuple(enemy_records), tuple(item_records)
+        self.saved[chunk.index] = (enemy_records, item_records)
+        self.count(enemy_records, item_records, 1)
+        chunk.release()
+
+    def static_layers(self):
+        """Capas estáticas de los trozos activos: (capa, x en el mundo)"""
+        return [(self.level.chunk(index).layer, self.level.chunk(index).left)
+                for index in sorted(self.active)]
@@ -0,0 +1,172 @@
+"""Perfilador de frames con temporizadores por subsistema.
+
+Cada etapa del bucle se mide con un temporizador con ámbito::
+
+    with profiler.section('colisiones'):
+        ...
+
+Los tiempos de un frame se acumulan por nombre (un frame puede ejecutar
+varios ticks) y al cerrar el frame se guardan en una ventana móvil de la
+que salen la media, el p95 y el p99 de cada etapa. F3 muestra u oculta el
+panel con esas cifras y una gráfica de la duración de los frames. Con
+``record`` se guardan además todos los frames (en arrays compactos) para
+exportarlos a CSV al salir.
+"""
+import array
+import csv
+import os
+import time
+from collections import deque
+import numpy as np
+import pygame
+from config import *
+from utils.text_cache import get_font
+
+PROFILER_WINDOW = 240    # Frames en la ventana móvil (medias y percentiles)
+PROFILER_REFRESH = 15    # Frames entre redibujados del panel
+FRAME_BUDGET_MS = 1000 / FPS
+
+
+class _Section:
+    """Temporizador reutilizable de una etapa (evita crear objetos por uso)"""
+    __slots__ = ('totals', 'name', 'start')
+
+    def __init__(self, totals, name):
+        self.totals = totals
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        totals = self.totals
+        totals[self.name] = totals.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+class _NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_SECTION = _NullSection()
+
+
+class FrameProfiler:
+    """Tiempos por etapa de cada frame y panel de depuración (F3)"""
+
+    def __init__(self, enabled=True, record=False, window=PROFILER_WINDOW):
+        self.enabled = enabled
+        self.record = record
+        self.visible = False
+        self.current = {}       # etapa -> segundos acumulados en el frame actual
+        self.sections = {}      # etapa -> _Section
+        self.names = []         # Etapas en orden de aparición
+        self.window = deque(maxlen=window)  # (duración del frame, {etapa: segundos})
+        self.frames = []        # Si ``record``: array por frame (ms total y por etapa)
+        self.frame_start = None
+        self.panel = None
+        self.panel_age = 0
+
+    def section(self, name):
+        """Temporizador con ámbito de la etapa ``name``"""
+        if not self.enabled:
+            return _NULL_SECTION
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = _Section(self.current, name)
+            self.names.append(name)
+        return section
+
+    def end_frame(self):
+        """Cerrar el frame actual (mide desde el cierre del anterior)"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            frame = now - self.frame_start
+            self.window.append((frame, dict(self.current)))
+            if self.record:
+                current = self.current
+                self.frames.append(array.array('f', [frame * 1000] + [
+                    current.get(name, 0.0) * 1000 for name in self.names]))
+        self.frame_start = now
+        self.current.clear()
+        self.panel_age += 1
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.panel = None
+
+    def stats(self):
+        """Por etapa (y 'frame'): (media, p95, p99) en ms sobre la ventana móvil"""
+        if not self.window:
+            return {}
+        columns = {'frame': np.array([frame for frame, _ in self.window]) * 1000}
+        for name in self.names:
+            columns[name] = np.array([times.get(name, 0.0) for _, times in self.window]) * 1000
+        return {name: (values.mean(), *np.percentile(values, (95, 99)))
+                for name, values in columns.items()}
+
+    def draw(self, screen):
+        """Dibujar el panel (si está visible) y devolver el área dibujada"""
+        if not self.visible or not self.window:
+            return None
+        if self.panel is None or self.panel_age >= PROFILER_REFRESH:
+            self.panel = self.build_panel()
+            self.panel_age = 0
+        return screen.blit(self.panel, (10, 140))
+
+    def build_panel(self):
+        font = get_font(20)
+        rows = [('etapa (ms)', 'media', 'p95', 'p99')]
+        for name, values in self.stats().items():
+            rows.append((name, *(f'{value:.2f}' for value in values)))
+
+        line_height = 16
+        graph_height = 60
+        width = 260
+        height = 10 + line_height * len(rows) + graph_height + 10
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, row in enumerate(rows):
+            y = 6 + i * line_height
+            panel.blit(font.render(row[0], True, TEXT_COLOR), (8, y))
+            # Columnas numéricas alineadas a la derecha
+            for column, text in zip((150, 200, 250), row[1:]):
+                label = font.render(text, True, TEXT_COLOR)
+                panel.blit(label, (column - label.get_width(), y))
+
+        # Gráfica de la duración de los frames (la línea marca el presupuesto)
+        top = height - graph_height - 6
+        scale = graph_height / (2 * FRAME_BUDGET_MS)
+        frames = [frame * 1000 for frame, _ in self.window][-(width - 16):]
+        for i, frame_ms in enumerate(frames):
+            bar = min(graph_height, int(frame_ms * scale))
+            color = (100, 220, 120) if frame_ms <= FRAME_BUDGET_MS * 1.05 else (240, 90, 90)
+            pygame.draw.line(panel, color, (8 + i, top + graph_height), (8 + i, top + graph_height - bar))
+        budget_y = top + graph_height - int(FRAME_BUDGET_MS * scale)
+        pygame.draw.line(panel, (255, 255, 120), (8, budget_y), (width - 8, budget_y))
+        return panel
+
+    def export_csv(self, path):
+        """Guardar una fila por frame (ms totales y de cada etapa)"""
+        if not self.frames:
+            return None
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['frame', 'frame_ms', *(f'{name}_ms' for name in self.names)])
+            columns = len(self.names) + 1
+            for i, values in enumerate(self.frames):
+                # Las etapas que aparecieron más tarde valen 0 en los primeros frames
+                row = [f'{value:.3f}' for value in values] + ['0.000'] * (columns - len(values))
+                writer.writerow([i, *row])
+        return path
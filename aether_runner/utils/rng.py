@@ -0,0 +1,45 @@
+"""Números aleatorios con semilla, separados por subsistema.
+
+Todo el azar de una partida sale de una única semilla. El de la simulación
+(lo que decide posiciones, colisiones y puntos) y el cosmético (estrellas,
+partículas) usan flujos independientes: añadir o quitar un efecto visual no
+cambia la partida. Los flujos que se usan fuera del hilo principal (la
+precarga de niveles) se derivan de la semilla y de una clave, así que no
+dependen del orden en que se ejecuten los hilos.
+"""
+import hashlib
+import random
+import numpy as np
+
+
+def random_seed():
+    """Semilla nueva para una partida sin semilla fija"""
+    return random.SystemRandom().randrange(1 << 31)
+
+
+def derive_seed(seed, *keys):
+    """Semilla de 64 bits para el flujo identificado por ``keys``"""
+    text = ':'.join(str(part) for part in (seed, *keys))
+    return int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], 'little')
+
+
+class RandomService:
+    """Generadores de una partida a partir de su semilla
+
+    ``cosmetic`` (``random.Random``) y ``particles`` (generador de NumPy)
+    avanzan durante la partida; ``gameplay_stream`` y ``cosmetic_stream`` crean
+    flujos nuevos y deterministas para una clave (p. ej. un nivel).
+    """
+
+    def __init__(self, seed=None):
+        self.seed = random_seed() if seed is None else seed
+        self.cosmetic = self.cosmetic_stream('efectos')
+        self.particles = np.random.default_rng(derive_seed(self.seed, 'cosmetico', 'particulas'))
+
+    def gameplay_stream(self, *keys):
+        """Flujo de la simulación para ``keys``"""
+        return random.Random(derive_seed(self.seed, 'juego', *keys))
+
+    def cosmetic_stream(self, *keys):
+        """Flujo cosmético para ``keys``"""
+        return random.Random(derive_seed(self.seed, 'cosmetico', *keys))
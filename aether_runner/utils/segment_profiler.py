@@ -0,0 +1,106 @@
+"""Captura con cProfile separada por nivel y por estado de la partida.
+
+Cada frame del bucle se atribuye a un segmento (nivel y ``game_state`` al
+empezar el frame) y se perfila con el ``cProfile.Profile`` de ese segmento.
+Con ``every`` > 1 solo se perfila uno de cada N frames: el resto corre sin
+instrumentar, así que las sesiones largas apenas se ralentizan y el coste del
+perfilador no deforma el reparto de tiempos.
+
+Al guardar, cada segmento produce ``<segmento>.pstats`` (para ``pstats`` o
+snakeviz) y ``<segmento>.collapsed``, con una pila por línea y microsegundos
+al final, listo para flamegraph.pl o speedscope. cProfile solo guarda pares
+llamador -> llamado, así que las pilas se reconstruyen repartiendo el tiempo
+de cada función entre sus llamadores en proporción a lo que tardó cada uno.
+"""
+import cProfile
+import os
+import pstats
+from collections import defaultdict
+
+MIN_STACK_TIME = 1e-6  # Segundos: las ramas más cortas no se exportan
+MAX_STACK_DEPTH = 96
+
+
+class SegmentProfiler:
+    """Un ``cProfile.Profile`` por segmento (nivel, estado)"""
+
+    def __init__(self, directory, every=1):
+        self.directory = directory
+        self.every = max(1, every)
+        self.profiles = {}  # segmento -> cProfile.Profile
+        self.frames = defaultdict(int)  # segmento -> frames perfilados
+        self.frame = 0
+        self.active = None
+
+    def begin_frame(self, segment):
+        """Empezar un frame del segmento (solo se perfila uno de cada ``every``)"""
+        self.frame += 1
+        if self.frame % self.every:
+            return
+        profile = self.profiles.get(segment)
+        if profile is None:
+            profile = self.profiles[segment] = cProfile.Profile()
+        self.frames[segment] += 1
+        self.active = profile
+        profile.enable()
+
+    def end_frame(self):
+        if self.active is not None:
+            self.active.disable()
+            self.active = None
+
+    def save(self):
+        """Escribir los .pstats y .collapsed de cada segmento y devolver sus rutas"""
+        self.end_frame()
+        os.makedirs(self.directory, exist_ok=True)
+        paths = []
+        for segment, profile in self.profiles.items():
+            base = os.path.join(self.directory, segment)
+            profile.dump_stats(base + '.pstats')
+            with open(base + '.collapsed', 'w', encoding='utf-8') as collapsed_file:
+                for stack, seconds in collapsed_stacks(pstats.Stats(profile)).items():
+                    collapsed_file.write(f'{stack} {round(seconds * 1e6)}\n')
+            paths.append(base + '.pstats')
+        return paths
+
+
+def frame_label(func):
+    filename, line, name = func
+    if filename == '~':
+        return name  # Función integrada: '<built-in method ...>'
+    return f'{name} ({os.path.basename(filename)}:{line})'
+
+
+def collapsed_stacks(stats):
+    """Pilas reconstruidas desde las raíces: {'a;b;c': segundos propios}"""
+    entries = stats.stats  # función -> (cc, nc, tiempo propio, acumulado, llamadores)
+    callees = defaultdict(list)
+    roots = []
+    for func, (_, _, _, _, callers) in entries.items():
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            callees[caller].append((func, edge[3]))  # Acumulado bajo ese llamador
+
+    stacks = defaultdict(float)
+
+    def walk(func, path, labels, share):
+        # ``share``: fracción del tiempo de ``func`` que pasa por esta pila
+        _, _, own, total, _ = entries[func]
+        labels = labels + (frame_label(func),)
+        if own * share >= MIN_STACK_TIME:
+            stacks[';'.join(labels)] += own * share
+        if total <= 0 or len(labels) >= MAX_STACK_DEPTH:
+            return
+        path = path | {func}
+        for callee, edge_total in callees[func]:
+            callee_total = entries[callee][3]
+            if callee in path or callee_total <= 0:
+                continue  # Recursión: ya se contó en el nivel de arriba
+            callee_share = edge_total * share / callee_total
+            if edge_total * share >= MIN_STACK_TIME:
+                walk(callee, path, labels, callee_share)
+
+    for root in roots:
+        walk(root, frozenset(), (), 1.0)
+    return stacks
@@ -0,0 +1,209 @@
+"""Carga de sprites desde un atlas pre-horneado.
+
+Todos los sprites del juego se dibujan de forma procedural. Para acelerar el
+arranque en equipos lentos, ``bake_atlas()`` los renderiza una sola vez en un
+atlas empaquetado: un archivo de píxeles RGBA en bruto más un índice JSON con
+el rectángulo de cada frame. En tiempo de ejecución ``load_sprite()`` abre el
+atlas mediante un mapa de memoria y entrega subsuperficies; si el atlas no
+existe o está obsoleto se usa el constructor procedural.
+
+Cada clave se resuelve una sola vez por proceso: todas las instancias de un
+mismo tipo comparten la misma superficie, que nunca debe modificarse. La
+caché está protegida con un cerrojo porque el nivel siguiente se prepara en
+un hilo de fondo.
+"""
+import glob
+import hashlib
+import json
+import mmap
+import os
+import threading
+import pygame
+from config import *
+
+ATLAS_DIR = os.path.join(ASSETS_DIR, 'atlas')
+ATLAS_PIXELS = os.path.join(ATLAS_DIR, 'sprites.rgba')
+ATLAS_INDEX = os.path.join(ATLAS_DIR, 'sprites.json')
+ATLAS_VERSION = 1
+ATLAS_WIDTH = 1024
+ATLAS_PADDING = 1
+
+# Módulos que dibujan sprites: si cambian, el atlas queda obsoleto
+SPRITE_SOURCES = ('config.py', 'player.py', 'enemies.py', 'projectiles.py', 'items.py', 'game.py')
+
+_atlas = None          # clave -> subsuperficie
+_atlas_checked = False
+_atlas_buffer = None   # mantiene vivo el mapa de memoria
+_recording = None      # clave -> superficie procedural (solo durante el horneado)
+_sprite_cache = {}     # clave -> superficie compartida
+_lock = threading.RLock()
+
+
+def source_signature():
+    """Firma de las fuentes que generan sprites (código y niveles)"""
+    digest = hashlib.sha1(f'atlas-v{ATLAS_VERSION}'.encode())
+    paths = [os.path.join(BASE_DIR, name) for name in SPRITE_SOURCES]
+    paths += sorted(glob.glob(os.path.join(LEVELS_DIR, '*.json')))
+    for path in paths:
+        with open(path, 'rb') as source:
+            digest.update(source.read().replace(b'\r\n', b'\n'))
+    return digest.hexdigest()
+
+
+def load_atlas():
+    """Abrir el atlas (una vez) y devolver el mapeo clave -> subsuperficie
+
+    Devuelve None si el atlas no existe, está incompleto o es obsoleto.
+    """
+    global _atlas, _atlas_checked, _atlas_buffer
+    if _atlas_checked:
+        return _atlas
+    _atlas_checked = True
+
+    try:
+        with open(ATLAS_INDEX, 'r', encoding='utf-8') as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError):
+        return None
+
+    if index.get('version') != ATLAS_VERSION or index.get('signature') != source_signature():
+        print("⚠️ Atlas de sprites obsoleto, usando sprites procedurales")
+        return None
+
+    width, height = index['size']
+    try:
+        with open(ATLAS_PIXELS, 'rb') as pixels:
+            buffer = mmap.mmap(pixels.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(buffer) != width * height * 4:
+        buffer.close()
+        print("⚠️ Atlas de sprites incompleto, usando sprites procedurales")
+        return None
+
+    sheet = pygame.image.frombuffer(buffer, (width, height), 'RGBA')
+    if pygame.display.get_surface() is not None:
+        # Una sola conversión de todo el atlas al formato de la pantalla
+        sheet = sheet.convert_alpha()
+        buffer.close()
+    else:
+        _atlas_buffer = buffer
+
+    _atlas = {key: sheet.subsurface(rect) for key, rect in index['frames'].items()}
+    return _atlas
+
+
+def load_sprite(key, builder):
+    """Obtener el sprite compartido de ``key``
+
+    Se busca en la caché, después en el atlas y, si no está, se crea con
+    ``builder()`` y se convierte al formato de la pantalla.
+    """
+    surface = _sprite_cache.get(key)
+    if surface is not None:
+        return surface
+
+    with _lock:
+        surface = _sprite_cache.get(key)
+        if surface is not None:
+            return surface
+
+        atlas = load_atlas()
+        if atlas is not None and key in atlas:
+            surface = atlas[key]
+        else:
+            surface = builder()
+            if _recording is not None:
+                _recording[key] = surface
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+
+        _sprite_cache[key] = surface
+        return surface
+
+
+def clear_sprite_cache():
+    """Olvidar los sprites compartidos (p. ej. tras cambiar el modo de vídeo)"""
+    with _lock:
+        _sprite_cache.clear()
+
+
+def pack_sprites(sizes, width=ATLAS_WIDTH, padding=ATLAS_PADDING):
+    """Empaquetar rectángulos por estantes; devuelve (alto, clave -> rect)"""
+    placements = {}
+    x = y = shelf_height = 0
+    order = sorted(sizes, key=lambda key: (-sizes[key][1], -sizes[key][0], key))
+    for key in order:
+        w, h = sizes[key]
+        if x + w > width:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+        placements[key] = (x, y, w, h)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+    return y + shelf_height, placements
+
+
+def collect_sprites():
+    """Ejecutar todos los constructores procedurales y capturar sus sprites"""
+    global _recording, _atlas, _atlas_checked
+    from game import Game
+    from enemies import Enemy
+    from projectiles import ProjectilePool
+    from items import Item
+    from player import Player
+
+    # Ignorar cualquier atlas existente y la caché mientras se hornea
+    _atlas, _atlas_checked = None, True
+    _recording = {}
+    clear_sprite_cache()
+    Player._frame_cache = None
+    try:
+        game = Game()
+        for level in range(1, LEVEL_COUNT + 1):
+            game.current_level = level
+            game.reset_game()
+        for enemy_type in ('FLOATER', 'SHOOTER'):
+            Enemy(0, 0, enemy_type)
+        ProjectilePool(capacity=1)
+        for item_type in ITEM_TYPES:
+            Item(0, 0, item_type)
+        return dict(_recording)
+    finally:
+        _recording = None
+        _atlas_checked = False
+        clear_sprite_cache()
+        Player._frame_cache = None
+
+
+def bake_atlas():
+    """Hornear todos los sprites procedurales en el atlas en disco"""
+    sprites = collect_sprites()
+    sizes = {key: surface.get_size() for key, surface in sprites.items()}
+    height, placements = pack_sprites(sizes)
+
+    sheet = pygame.Surface((ATLAS_WIDTH, max(1, height)), pygame.SRCALPHA)
+    sheet.fill((0, 0, 0, 0))
+    for key, (x, y, w, h) in placements.items():
+        # BLEND_RGBA_MAX sobre un fondo vacío copia los píxeles sin mezclar alfa
+        sheet.blit(sprites[key], (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+
+    index = {
+        'version': ATLAS_VERSION,
+        'signature': source_signature(),
+        'size': list(sheet.get_size()),
+        'frames': {key: list(rect) for key, rect in sorted(placements.items())},
+    }
+
+    os.makedirs(ATLAS_DIR, exist_ok=True)
+    with open(ATLAS_PIXELS + '.tmp', 'wb') as pixels:
+        pixels.write(pygame.image.tobytes(sheet, 'RGBA'))
+    os.replace(ATLAS_PIXELS + '.tmp', ATLAS_PIXELS)
+    # El índice se escribe al final: un horneado interrumpido queda obsoleto
+    with open(ATLAS_INDEX + '.tmp', 'w', encoding='utf-8') as index_file:
+        json.dump(index, index_file, separators=(',', ':'))
+    os.replace(ATLAS_INDEX + '.tmp', ATLAS_INDEX)
+
+    print(f"🧊 Atlas horneado: {len(placements)} sprites, {ATLAS_WIDTH}x{height}px")
+    return index
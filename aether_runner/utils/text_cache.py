@@ -0,0 +1,42 @@
+"""Registro de fuentes y caché de textos renderizados.
+
+Cargar una fuente y rasterizar texto en cada frame es caro. Las fuentes se
+cargan una sola vez por tamaño y las superficies de texto se guardan en una
+caché LRU con clave (texto, tamaño, color), de modo que solo se vuelven a
+renderizar los valores que cambian (puntos, vidas...).
+"""
+from collections import OrderedDict
+import pygame
+
+TEXT_CACHE_SIZE = 128
+
+_fonts = {}
+_text_cache = OrderedDict()
+
+
+def get_font(size):
+    """Obtener la fuente por defecto de un tamaño (cargada una sola vez)"""
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+
+def render_text(text, size, color):
+    """Renderizar texto usando la caché LRU"""
+    key = (text, size, tuple(color))
+    surface = _text_cache.get(key)
+    if surface is not None:
+        _text_cache.move_to_end(key)
+        return surface
+
+    surface = get_font(size).render(text, True, color)
+    _text_cache[key] = surface
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+    return surface
+
+
+def clear_text_cache():
+    """Vaciar la caché de textos (las fuentes se conservan)"""
+    _text_cache.clear()